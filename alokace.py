@@ -0,0 +1,155 @@
+import numpy as np
+from typing import NamedTuple
+
+from mereni import etapa
+
+# --- KONFIGURACE ---
+POCET_MANDATU = 200
+
+
+class VysledekAlokace(NamedTuple):
+    """
+    Kompletní výsledek rozdělení mandátů. Osa '...' je volitelná dávková osa,
+    S = strany, K = kraje.
+    """
+    mandaty_kraju: np.ndarray      # (..., K) mandáty přidělené krajům
+    rmc: np.ndarray                # (...)    republikové mandátové číslo
+    kvc: np.ndarray                # (..., K) krajská volební čísla
+    mandaty_f1: np.ndarray         # (..., S, K) mandáty z 1. skrutinia
+    zbytky_f1: np.ndarray          # (..., S, K) hlasy postupující do 2. skrutinia
+    rvc: np.ndarray                # (...)    republikové volební číslo
+    mandaty_f2_delenim: np.ndarray # (..., S) mandáty 2. skrutinia dělením RVČ
+    mandaty_f2_zbytky: np.ndarray  # (..., S) mandáty 2. skrutinia dle největších zbytků
+    zbytky_f2: np.ndarray          # (..., S) zbytek pro pořadí po dělení RVČ
+    mandaty_f2: np.ndarray         # (..., S) mandáty z 2. skrutinia celkem
+    umisteni_f2: np.ndarray        # (..., S, K) umístění mandátů 2. skrutinia do krajů
+    mandaty: np.ndarray            # (..., S, K) finální mandáty
+
+
+# --- POMOCNÉ FUNKCE ---
+
+def poradi_sestupne(x, axis=-1):
+    """Vrátí pořadí prvků podél osy (0 = největší). Shody vyhrává dřívější pozice, stejně jako u sorted()."""
+    idx = np.argsort(-x, axis=axis, kind='stable')
+    return np.argsort(idx, axis=axis, kind='stable')
+
+def _zaokrouhli(x):
+    """Zaokrouhlení na celé číslo shodné s Pythonovým round() (polovina k sudému)."""
+    return np.rint(x).astype(np.int64)
+
+def procenta_hlasu(hlasy, axis=-1):
+    """
+    Podíly hlasů v procentech oříznuté (ne zaokrouhlené) na 2 desetinná místa, stejně jako na volby.cz,
+    aby strana těsně pod klauzulí nepřešla zaokrouhlením. Nulový součet dává 0.
+    """
+    hlasy = np.asarray(hlasy, dtype=np.int64)
+    return (10_000 * hlasy // np.maximum(hlasy.sum(axis=axis, keepdims=True), 1)) / 100
+
+# --- VÝPOČETNÍ FUNKCE ---
+
+def rozdel_mandaty_krajum(hlasy_kraje, pocet_mandatu=POCET_MANDATU):
+    """
+    Rozdělí mandáty mezi kraje podle RMČ a největších zbytků.
+    hlasy_kraje: (..., K) celkový počet hlasů v krajích. Vrací (mandaty_kraju, rmc).
+    """
+    hlasy_kraje = np.asarray(hlasy_kraje, dtype=np.int64)
+    rmc = _zaokrouhli(hlasy_kraje.sum(axis=-1) / pocet_mandatu)
+    delitel = np.maximum(rmc, 1)[..., None]
+    mandaty = hlasy_kraje // delitel
+    zbytek = hlasy_kraje % delitel
+    zbyva = pocet_mandatu - mandaty.sum(axis=-1)
+    mandaty = mandaty + (poradi_sestupne(zbytek) < zbyva[..., None])
+    return mandaty, rmc
+
+def odecti_prebytek(hlasy, mandaty, zbytky, kvc, mandaty_kraju):
+    """
+    Bod 10 postupu ČSÚ: přidělí-li 1. skrutinium kraji víc mandátů, než kraj má, odečtou se přebývající mandáty
+    stranám s nejmenším zbytkem (při shodě té s menším počtem hlasů v kraji, pak dřívější straně) a odečtený
+    mandát vrátí straně KVČ hlasů do zbytku pro 2. skrutinium. Vrací (mandaty, zbytky).
+    """
+    prebytek = np.maximum(mandaty.sum(axis=-2) - mandaty_kraju, 0)
+    nasobek = hlasy.max(initial=0) + 1
+    while prebytek.any():
+        klic = np.where(mandaty > 0, zbytky * nasobek + hlasy, np.iinfo(np.int64).max)
+        odecet = ((poradi_sestupne(-klic, axis=-2) < prebytek[..., None, :]) & (mandaty > 0)).astype(np.int64)
+        mandaty = mandaty - odecet
+        zbytky = zbytky + odecet * kvc[..., None, :]
+        prebytek = prebytek - odecet.sum(axis=-2)
+    return mandaty, zbytky
+
+def prvni_skrutinium(hlasy, mandaty_kraju):
+    """
+    Vektorová obdoba prvni_skrutinium_imperiali pro všechny kraje najednou, včetně odečtení mandátů
+    nad počet mandátů kraje (odecti_prebytek).
+    hlasy: (..., S, K) hlasy úspěšných stran, mandaty_kraju: (..., K).
+    Vrací (mandaty, zbytky, kvc).
+    """
+    kvc = _zaokrouhli(hlasy.sum(axis=-2) / (mandaty_kraju + 2))
+    delitel = np.maximum(kvc, 1)[..., None, :]
+    mandaty = np.where(kvc[..., None, :] > 0, hlasy // delitel, 0)
+    zbytky = hlasy - mandaty * kvc[..., None, :]
+    mandaty, zbytky = odecti_prebytek(hlasy, mandaty, zbytky, kvc, mandaty_kraju)
+    return mandaty, zbytky, kvc
+
+def druhe_skrutinium(zbytky_celkem, nerozdeleno, uspesne):
+    """
+    Vektorová obdoba druhe_skrutinium_kompletni.
+    zbytky_celkem: (..., S), nerozdeleno: (...), uspesne: (..., S) maska stran ve hře.
+    Vrací (mandaty_delenim, mandaty_zbytky, zbytky, rvc).
+    """
+    nerozdeleno = np.asarray(nerozdeleno, dtype=np.int64)
+    rvc = np.where(nerozdeleno > 0, _zaokrouhli(zbytky_celkem.sum(axis=-1) / (np.maximum(nerozdeleno, 0) + 1)), 0)
+    delitel = np.maximum(rvc, 1)[..., None]
+    delenim = np.where(rvc[..., None] > 0, zbytky_celkem // delitel, 0)
+    zbytky = zbytky_celkem - delenim * rvc[..., None]
+    zbyva = nerozdeleno - delenim.sum(axis=-1)
+    poradi = poradi_sestupne(np.where(uspesne, zbytky, -1))
+    dle_zbytku = (poradi < zbyva[..., None]) & uspesne
+    return delenim, dle_zbytku.astype(np.int64), zbytky, rvc
+
+def umisti_mandaty(zbytky_f1, mandaty_f2):
+    """
+    Umístí mandáty 2. skrutinia do krajů s největšími zbytky strany (obdoba nlargest po řádcích).
+    zbytky_f1: (..., S, K), mandaty_f2: (..., S). Vrací (..., S, K) s nulami a jedničkami.
+    """
+    return (poradi_sestupne(zbytky_f1) < mandaty_f2[..., None]).astype(np.int64)
+
+def alokuj(hlasy, uspesne=None, hlasy_kraje=None, mandaty_kraju=None, pocet_mandatu=POCET_MANDATU, mereni=None):
+    """
+    Provede celé rozdělení mandátů pouze pomocí operací nad poli.
+
+    hlasy:         int64 (..., S, K) hlasy stran v krajích, volitelně s dávkovou osou vpředu.
+    uspesne:       bool (S,) nebo (..., S) strany, které prošly klauzulí (výchozí: všechny).
+    hlasy_kraje:   (..., K) celkové hlasy v krajích pro rozdělení mandátů krajům
+                   (výchozí: součet matice hlasy přes strany).
+    mandaty_kraju: (..., K) hotové rozdělení mandátů krajům; pokud je zadáno, RMČ se nepočítá.
+    mereni:        volitelné mereni.Mereni pro etapy rozdeleni_kraju, prvni_skrutinium a druhe_skrutinium.
+    """
+    hlasy = np.asarray(hlasy, dtype=np.int64)
+    uspesne = np.ones(hlasy.shape[:-1], dtype=bool) if uspesne is None else np.broadcast_to(np.asarray(uspesne, dtype=bool), hlasy.shape[:-1])
+
+    with etapa(mereni, 'rozdeleni_kraju'):
+        if mandaty_kraju is None:
+            if hlasy_kraje is None:
+                hlasy_kraje = hlasy.sum(axis=-2)
+            mandaty_kraju, rmc = rozdel_mandaty_krajum(hlasy_kraje, pocet_mandatu)
+        else:
+            mandaty_kraju = np.broadcast_to(np.asarray(mandaty_kraju, dtype=np.int64), hlasy.shape[:-2] + hlasy.shape[-1:])
+            rmc = np.zeros(hlasy.shape[:-2], dtype=np.int64)
+
+    with etapa(mereni, 'prvni_skrutinium'):
+        hlasy_uspesnych = np.where(uspesne[..., None], hlasy, 0)
+        mandaty_f1, zbytky_f1, kvc = prvni_skrutinium(hlasy_uspesnych, mandaty_kraju)
+
+    with etapa(mereni, 'druhe_skrutinium'):
+        nerozdeleno = pocet_mandatu - mandaty_f1.sum(axis=(-2, -1))
+        delenim, dle_zbytku, zbytky_f2, rvc = druhe_skrutinium(zbytky_f1.sum(axis=-1), nerozdeleno, uspesne)
+        mandaty_f2 = delenim + dle_zbytku
+        umisteni_f2 = umisti_mandaty(zbytky_f1, mandaty_f2)
+    return VysledekAlokace(
+        mandaty_kraju=mandaty_kraju, rmc=rmc, kvc=kvc,
+        mandaty_f1=mandaty_f1, zbytky_f1=zbytky_f1,
+        rvc=rvc, mandaty_f2_delenim=delenim, mandaty_f2_zbytky=dle_zbytku,
+        zbytky_f2=zbytky_f2, mandaty_f2=mandaty_f2,
+        umisteni_f2=umisteni_f2, mandaty=mandaty_f1 + umisteni_f2
+    )
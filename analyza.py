@@ -1,7 +1,13 @@
 import pandas as pd
 import numpy as np
 import os
-from collections import Counter
+import argparse
+from alokace import alokuj
+from mereni import Mereni
+from nacitani import nacti_vysledky
+from potrebne_hlasy import hlasy_k_mandatu
+from statistiky import bilance_hlasu, efektivita, tabulka_cen
+from vystup import over_format_tabulek, uloz_report
 
 # --- KONFIGURACE ---
 KRAJE_NAZVY = [
@@ -12,6 +18,7 @@ KRAJE_NAZVY = [
 ]
 VOLEBNI_KLAUZULE = 5.0
 NAZEV_VYSTUPNIHO_SOUBORU = 'volebni_analyza_2025_kompletni.xlsx'
+ZDROJE_VYSLEDKU = ['Celkem'] + KRAJE_NAZVY + ['Zahranici']
 
 MAPOVANI_NAZVU_STRAN = {
     'Svoboda a př. demokracie (SPD)': 'SPD',
@@ -24,28 +31,6 @@ MAPOVANI_NAZVU_STRAN = {
 
 # --- POMOCNÉ FUNKCE ---
 
-def write_section(writer, sheet_name, title, text, dataframe, start_row):
-    """Zapíše sekci (nadpis, text a tabulku) na jeden list Excelu s xlsxwriter."""
-    dataframe.to_excel(writer, sheet_name=sheet_name, startrow=start_row + 9, header=False)
-    workbook = writer.book
-    worksheet = writer.sheets[sheet_name]
-    
-    title_format = workbook.add_format({'bold': True, 'font_size': 14, 'bottom': 1})
-    text_format = workbook.add_format({'text_wrap': True, 'valign': 'top', 'italic': True})
-    header_format = workbook.add_format({'bold': True, 'text_wrap': True, 'valign': 'top', 'border': 1, 'align': 'center', 'bg_color': '#F2F2F2'})
-
-    worksheet.merge_range(start_row, 0, start_row, 15, title, title_format)
-    worksheet.merge_range(start_row + 2, 0, start_row + 6, 15, text, text_format)
-    
-    current_write_row = start_row + 8
-    
-    for col_num, value in enumerate(dataframe.columns.values):
-        worksheet.write(current_write_row, col_num + 1, value, header_format)
-    if dataframe.index.name:
-        worksheet.write(current_write_row, 0, dataframe.index.name, header_format)
-    
-    return current_write_row + len(dataframe) + 5
-
 def autofit_columns(worksheet, dataframe, index=False):
     """Přizpůsobí šířku sloupců na daném listu."""
     offset = 1 if index else 0
@@ -58,8 +43,9 @@ def autofit_columns(worksheet, dataframe, index=False):
          worksheet.set_column(0, 0, max_len)
 
 # --- VÝPOČETNÍ FUNKCE ---
-def spocitej_mandaty_pro_kraje():
-    hlasy = {n: pd.read_csv(f'vysledky_ps2025_{n}.csv', sep=';')['hlasy_celkem'].sum() for n in KRAJE_NAZVY}
+def spocitej_mandaty_pro_kraje(data=None):
+    data = data if data is not None else nacti_vysledky(ZDROJE_VYSLEDKU)
+    hlasy = dict(zip(KRAJE_NAZVY, data.hlasy[:, data.sloupce(KRAJE_NAZVY)].sum(axis=0)))
     df = pd.DataFrame.from_dict(hlasy, orient='index', columns=['celkem hlasu'])
     rmc = round(df['celkem hlasu'].sum() / 200)
     df['mandaty krok 1'] = df['celkem hlasu'] // rmc; df['zbytek'] = df['celkem hlasu'] % rmc
@@ -70,6 +56,17 @@ def spocitej_mandaty_pro_kraje():
     df.loc['CELKEM'] = df.sum(numeric_only=True)
     return df, df.loc[df.index != 'CELKEM', 'mandaty final'].to_dict(), rmc
 
+def nacti_matici_hlasu(data=None):
+    """Vrátí hlasy všech stran jako tabulku strany × kraje (včetně sloupce Zahranici)."""
+    data = data if data is not None else nacti_vysledky(ZDROJE_VYSLEDKU)
+    sloupce = KRAJE_NAZVY + ['Zahranici']
+    return pd.DataFrame(data.hlasy[:, data.sloupce(sloupce)], index=pd.Index(data.strany, name='nazev_strany'), columns=sloupce)
+
+def alokuj_tabulku(df_hlasy, uspesne_strany, pocet_mandatu=200):
+    """Rozdělí mandáty nad tabulkou hlasů strany × kraje (sloupce KRAJE_NAZVY) a vrátí tabulku mandátů."""
+    vysledek = alokuj(df_hlasy[KRAJE_NAZVY].to_numpy(np.int64), df_hlasy.index.isin(uspesne_strany), pocet_mandatu=pocet_mandatu)
+    return pd.DataFrame(vysledek.mandaty, index=df_hlasy.index, columns=KRAJE_NAZVY)
+
 def prvni_skrutinium_imperiali(hlasy, pocet_mandatu):
     celkem = sum(hlasy.values()); kvc = round(celkem / (pocet_mandatu + 2)) if pocet_mandatu > -2 else 0
     m, z2, z3 = {}, {}, {}
@@ -100,43 +97,58 @@ def druhe_skrutinium_kompletni(zbytky_celkem, nerozdeleno):
     return mandaty, rvc, df
 
 # --- HLAVNÍ FUNKCE ---
-def analyzuj_vysledky():
+def analyzuj_vysledky(vystupni_soubor=NAZEV_VYSTUPNIHO_SOUBORU, format_vystupu='xlsx', constant_memory=False, data=None, mereni=None,
+                      potrebne_hlasy=False):
+    """
+    Spočítá celé rozdělení mandátů a uloží report. format_vystupu: 'xlsx' (vystupni_soubor je soubor)
+    nebo 'csv'/'json'/'parquet' (vystupni_soubor je adresář s jednou tabulkou na sekci). data jsou
+    VolebniData (např. z okrsky.agreguj); bez nich se načtou CSV ze scraperu. S mereni (mereni.Mereni)
+    se zaznamenají etapy nacteni, priprava (tabulka rozdělení mezi kraje a matice hlasů pro report),
+    etapy alokace (rozdeleni_kraju, prvni_skrutinium, druhe_skrutinium), druhe_skrutinium_report (rozpis
+    2. skrutinia pro report), statistiky, hlasy_k_mandatu (jen s potrebne_hlasy), tabulky a zapis.
+    S potrebne_hlasy=True se přidají sekce KROK12 a KROK13 (hlasy k zisku a ztrátě mandátu); jejich přesný
+    výpočet trvá řádově sekundu, proto jsou volitelné. Vrací VysledekAlokace, při chybě None.
+    """
+    if format_vystupu != 'xlsx':
+        try:
+            over_format_tabulek(format_vystupu)
+        except (ValueError, ImportError) as e:
+            print(f"\n❌ CHYBA: {e}")
+            return None
+    mezicas = mereni.mezicas if mereni is not None else (lambda nazev=None: None)
     try:
-        df_mandaty_kraje, pocty_mandatu, rmc_hodnota = spocitej_mandaty_pro_kraje()
-        df_celkem = pd.read_csv('vysledky_ps2025_Celkem.csv', sep=';')
+        mezicas('nacteni')
+        data = data if data is not None else nacti_vysledky(ZDROJE_VYSLEDKU)
+        mezicas('priprava')
+        df_mandaty_kraje, pocty_mandatu, rmc_hodnota = spocitej_mandaty_pro_kraje(data)
+        df_celkem = data.tabulka('Celkem')
         uspesne_strany = list(df_celkem[df_celkem['hlasy_procenta'] >= VOLEBNI_KLAUZULE]['nazev_strany'])
         
-        m1_dict, z2_dict, z3_dict, kvc_dict, hlasy_dict_uspesne = {}, {}, {}, {}, {}
-        for nazev, pocet in pocty_mandatu.items():
-            df_k = pd.read_csv(f'vysledky_ps2025_{nazev}.csv', sep=';'); hlasy = dict(zip(df_k['nazev_strany'], df_k['hlasy_celkem']))
-            hlasy_uspesnych = {s: hlasy.get(s, 0) for s in uspesne_strany}; hlasy_dict_uspesne[nazev] = hlasy_uspesnych
-            m, z2, z3, kvc = prvni_skrutinium_imperiali(hlasy_uspesnych, pocet)
-            m1_dict[nazev], z2_dict[nazev], z3_dict[nazev], kvc_dict[nazev] = m, z2, z3, kvc
-        df_hlasy_uspesne = pd.DataFrame(hlasy_dict_uspesne).fillna(0).astype(int)
-        df_m1 = pd.DataFrame(m1_dict).fillna(0).astype(int); df_z2 = pd.DataFrame(z2_dict).fillna(0).astype(int); df_z3 = pd.DataFrame(z3_dict).fillna(0).astype(int)
-        
+        kraje = list(pocty_mandatu)
+        df_hlasy_uspesne = nacti_matici_hlasu(data).loc[uspesne_strany, kraje].astype(int)
+        df_hlasy_uspesne.index.name = None
+
+        mezicas(None)
+        vysledek = alokuj(df_hlasy_uspesne.to_numpy(), mandaty_kraju=[pocty_mandatu[k] for k in kraje], mereni=mereni)
+        mezicas('druhe_skrutinium_report')
+        df_m1 = pd.DataFrame(vysledek.mandaty_f1, index=df_hlasy_uspesne.index, columns=kraje)
+        df_z2 = pd.DataFrame(vysledek.zbytky_f1, index=df_hlasy_uspesne.index, columns=kraje)
+        kvc_dict = dict(zip(kraje, vysledek.kvc.tolist()))
+
         mandaty_nerozdeleno_f1 = 200 - df_m1.sum().sum()
         mandaty_f2, rvc_hodnota, df_f2_vypocet = druhe_skrutinium_kompletni(df_z2.sum(axis=1).to_dict(), mandaty_nerozdeleno_f1)
-        
-        fin_mandaty = df_m1.copy()
-        for s, p in mandaty_f2.items():
-            if p > 0:
-                for kraj in df_z3.loc[s].nlargest(p).index: fin_mandaty.loc[s, kraj] += 1
+
+        mezicas('statistiky')
+
+        fin_mandaty = pd.DataFrame(vysledek.mandaty, index=df_hlasy_uspesne.index, columns=kraje)
         df_vysledek = fin_mandaty.transpose().rename(columns=MAPOVANI_NAZVU_STRAN).reindex(columns=list(MAPOVANI_NAZVU_STRAN.values()), fill_value=0)
         df_vysledek['Celkem mandátů v kraji'] = df_vysledek.sum(axis=1); df_vysledek.loc['Celkem mandátů strany'] = df_vysledek.sum()
 
-        pouzite_f1_total = sum(df_m1.loc[s, k] * kvc_dict[k] for s in df_m1.index for k in df_m1.columns)
-        df_f2_cisty = df_f2_vypocet.drop('CELKEM', errors='ignore')
-        pouzite_f2_total = (
-            (df_f2_cisty['mandaty delenim'] * rvc_hodnota).sum()
-            + df_f2_cisty.loc[df_f2_cisty['mandaty dle zbytku'] > 0, 'zbytek pro poradi'].sum()
-        )
+        bilance = bilance_hlasu(vysledek)
+        pouzite_f1_total, pouzite_f2_total, nevyuzite_total = bilance['pouzite_f1'], bilance['pouzite_f2'], bilance['nevyuzite']
 
         df_nevyuzite_final = df_f2_vypocet.loc[(df_f2_vypocet.index != 'CELKEM') & (df_f2_vypocet['mandaty dle zbytku'] == 0), ['zbytek pro poradi']].rename(columns={'zbytek pro poradi': 'Nevyužité hlasy (zbytky po 2. skrutiniu)'})
-        if not df_nevyuzite_final.empty:
-            df_nevyuzite_final.loc['CELKEM'] = df_nevyuzite_final.sum()
-            nevyuzite_total = df_nevyuzite_final.loc['CELKEM'].iloc[0]
-        else: nevyuzite_total = 0
+        if not df_nevyuzite_final.empty: df_nevyuzite_final.loc['CELKEM'] = df_nevyuzite_final.sum()
             
         propadle_total = df_celkem[df_celkem['hlasy_procenta'] < VOLEBNI_KLAUZULE]['hlasy_celkem'].sum()
         celkem_propadlo_nevyuzito = propadle_total + nevyuzite_total; celkem_vsech_hlasu = df_celkem['hlasy_celkem'].sum()
@@ -146,86 +158,88 @@ def analyzuj_vysledky():
         hlasy_numeric = pd.to_numeric(df_rozpis['Počet hlasů'], errors='coerce'); mandaty_numeric = pd.to_numeric(df_rozpis['Počet mandátů'], errors='coerce')
         df_rozpis['Průměr na 1 mandát'] = np.divide(hlasy_numeric, mandaty_numeric).fillna(0).apply(lambda x: f"{int(x)}" if x != 0 else '')
 
-        ceny_mandatu = []
-        for s in df_m1.index:
-            for k in df_m1.columns:
-                if df_m1.loc[s, k] > 0: ceny_mandatu.extend([kvc_dict[k]] * df_m1.loc[s, k])
-        
-        df_f2_cisty = df_f2_vypocet.drop('CELKEM', errors='ignore')
-        for s, row in df_f2_cisty.iterrows():
-            if row['mandaty delenim'] > 0: ceny_mandatu.extend([rvc_hodnota] * row['mandaty delenim'])
-            if row['mandaty dle zbytku'] > 0: ceny_mandatu.append(row['zbytek pro poradi'])
-            
-        pocetnost_cen = Counter(ceny_mandatu)
-        df_ceny = pd.DataFrame(pocetnost_cen.items(), columns=['Cena mandátu (počet hlasů)', 'Počet mandátů za tuto cenu'])
-        df_ceny = df_ceny.sort_values(by='Cena mandátu (počet hlasů)', ascending=False).reset_index(drop=True)
-        df_ceny['Celkem hlasů'] = df_ceny['Cena mandátu (počet hlasů)'] * df_ceny['Počet mandátů za tuto cenu']
-        df_ceny = df_ceny[['Cena mandátu (počet hlasů)', 'Počet mandátů za tuto cenu', 'Celkem hlasů']].astype(int)
-        df_ceny.index.name = 'Pořadí'; df_ceny.index += 1
+        df_ceny = tabulka_cen(vysledek)
+
+        if potrebne_hlasy:
+            mezicas('hlasy_k_mandatu')
+            df_hlasy_vsech = nacti_matici_hlasu(data)[KRAJE_NAZVY]; radky_uspesnych = df_hlasy_vsech.index.isin(uspesne_strany)
+            hlasy_zisk, hlasy_ztrata = hlasy_k_mandatu(df_hlasy_vsech.to_numpy(), radky_uspesnych)
+            df_zisk, df_ztrata = [pd.DataFrame(h[radky_uspesnych], index=df_hlasy_vsech.index[radky_uspesnych], columns=KRAJE_NAZVY).rename(index=MAPOVANI_NAZVU_STRAN, columns=lambda n: n.replace('_', ' ')).rename_axis('Strana').astype('Int64') for h in (hlasy_zisk, hlasy_ztrata)]
 
         try:
-            writer = pd.ExcelWriter(NAZEV_VYSTUPNIHO_SOUBORU, engine='xlsxwriter')
+            mezicas('tabulky')
             df_m_k_vystup = df_mandaty_kraje.rename(index={n:n.replace('_',' ') for n in df_mandaty_kraje.index})
             df_hlasy_vystup = df_hlasy_uspesne.rename(index=MAPOVANI_NAZVU_STRAN, columns={n:n.replace('_',' ') for n in df_hlasy_uspesne.columns}); df_hlasy_vystup['CELKEM STRANY']=df_hlasy_vystup.sum(axis=1); df_hlasy_vystup.loc['CELKEM V KRAJI']=df_hlasy_vystup.sum()
             df_m1_vystup = df_m1.rename(index=MAPOVANI_NAZVU_STRAN, columns={n:n.replace('_',' ') for n in df_m1.columns}); df_m1_vystup['CELKEM STRANY']=df_m1_vystup.sum(axis=1); df_m1_vystup.loc['CELKEM V KRAJI']=df_m1_vystup.sum()
             df_z2_vystup = df_z2.rename(index=MAPOVANI_NAZVU_STRAN, columns={n:n.replace('_',' ') for n in df_z2.columns}); df_z2_vystup['CELKEM STRANY']=df_z2_vystup.sum(axis=1); df_z2_vystup.loc['CELKEM V KRAJI']=df_z2_vystup.sum()
             df_f2_vystup = df_f2_vypocet.rename(index=MAPOVANI_NAZVU_STRAN)
             uspesne_mapovane = {k: v for k, v in MAPOVANI_NAZVU_STRAN.items() if k in uspesne_strany}
-            df_hlasy_celkem_uspesne = df_celkem[df_celkem['nazev_strany'].isin(uspesne_strany)].set_index('nazev_strany')
-            df_mandaty_celkem_uspesne = df_vysledek.loc['Celkem mandátů strany']
-            efektivita_data = [{'Strana': map_nazev, 'Celkem hlasů': df_hlasy_celkem_uspesne.loc[orig_nazev, 'hlasy_celkem'], 'Celkem mandátů': int(df_mandaty_celkem_uspesne.get(map_nazev, 0)), 'Průměr hlasů na mandát': int(df_hlasy_celkem_uspesne.loc[orig_nazev, 'hlasy_celkem'] / df_mandaty_celkem_uspesne.get(map_nazev, 1)) if df_mandaty_celkem_uspesne.get(map_nazev, 0) > 0 else 0} for orig_nazev, map_nazev in uspesne_mapovane.items()]
-            df_efektivita = pd.DataFrame(efektivita_data).set_index('Strana')
+            hlasy_celkem_uspesnych = df_celkem.set_index('nazev_strany')['hlasy_celkem'].reindex(df_hlasy_uspesne.index).to_numpy()
+            mandaty_stran, prumer_na_mandat = efektivita(vysledek, hlasy_celkem_uspesnych)
+            df_efektivita = pd.DataFrame({'Celkem hlasů': hlasy_celkem_uspesnych, 'Celkem mandátů': mandaty_stran, 'Průměr hlasů na mandát': prumer_na_mandat}, index=df_hlasy_uspesne.index).loc[list(uspesne_mapovane)].rename(index=MAPOVANI_NAZVU_STRAN).rename_axis('Strana')
             df_kvc_vystup = pd.DataFrame.from_dict(kvc_dict, orient='index', columns=['Krajské volební číslo (KVČ)']).rename_axis('Kraj')
             df_kvc_vystup.index = df_kvc_vystup.index.str.replace('_', ' ')
             df_vysledek_vystup = df_vysledek.rename(index={n: n.replace('_', ' ') for n in df_vysledek.index})
 
 
-            with writer:
-                sheet_calc = '00_Postup_vypoctu'
-                popisky = {
-                    "KROK1": f"Nejprve se rozdělí 200 mandátů mezi kraje dle odevzdaných hlasů. Použije se republikové mandátové číslo (RMČ), které pro tyto volby činí {rmc_hodnota:,} hlasů, a metoda největších zbytků.\nPočet hlasů v kraji se vydělí RMČ. Tím kraj získá první várku mandátů. Zbylé mandáty se pak přidělí krajům s největším zbytkem po tomto dělení.",
-                    "KROK2": "Do výpočtu vstupují pouze hlasy pro strany, které na celostátní úrovni překročily 5% hranici. Hlasy pro ostatní strany propadají.",
-                    "KROK3": "Pro každý kraj se spočítá unikátní krajské volební číslo (KVČ). Vypočítá se tak, že se součet hlasů úspěšných stran v daném kraji vydělí počtem mandátů pro tento kraj, zvětšeným o 2.",
-                    "KROK4": "Počet mandátů pro stranu v kraji se určí tak, že se vezme počet hlasů dané strany v kraji, vydělí se krajským volebním číslem (KVČ) a výsledek se zaokrouhlí dolů na celé číslo.",
-                    "KROK5": "Tato tabulka ukazuje hlasy, které nebyly využity v 1. kole a postupují do 2. kola. Podle zákona mají dvojí roli: slouží jak pro výpočet mandátů ve 2. kole, tak pro jejich následné umístění do krajů. V těchto konkrétních výsledcích jsou hodnoty pro oba účely totožné, protože žádná strana v žádném kraji nezůstala v 1. kole bez mandátu.",
-                    "KROK6": f"Zde se sečtou všechny hlasy z předchozího kroku a rozdělí se jimi zbývající mandáty. Používá se republikové volební číslo (RVČ), které pro tyto volby činí {rvc_hodnota:,} hlasů, a metoda největších zbytků.",
-                    "KROK7": "Toto je finální přehled rozdělení všech 200 mandátů. Tabulka sčítá mandáty získané v 1. skrutiniu s mandáty z 2. skrutinia, které byly na základě největších zbytků hlasů přiděleny do konkrétních krajů.",
-                    "KROK8": "Hlasy úspěšných stran, které postoupily do 2. kola, ale ani zde nestačily na zisk mandátu. Jedná se o zbytky po dělení RVČ u stran, kterým nebyl přidělen mandát na základě pořadí zbytků.",
-                    "KROK9": "Tato tabulka shrnuje, jak byly všechny odevzdané hlasy využity, kolik jich bylo potřeba na mandáty v jednotlivých fázích a kolik jich celkem propadlo nebo zůstalo nevyužito.",
-                    "KROK10": "Tato tabulka ukazuje průměrný počet hlasů, který byl pro každou úspěšnou stranu potřeba k zisku jednoho mandátu. Nižší číslo znamená vyšší efektivitu přeměny hlasů na mandáty.",
-                    "KROK11": "Tato tabulka ukazuje přesné 'ceny' všech 200 rozdělených mandátů. Cena mandátu z 1. kola je krajské volební číslo (KVČ). Cena mandátu z 2. kola je buď republikové volební číslo (RVČ), nebo výše zbytkového balíku hlasů, který mandát zajistil. Mandáty se stejnou cenou jsou sečteny."
-                }
-                all_sections = [
-                    (f"Rozdělení mandátů mezi kraje (RMČ = {rmc_hodnota:,})", popisky["KROK1"], df_m_k_vystup),
-                    ("Vstupní hlasy pro 1. skrutinium", popisky["KROK2"], df_hlasy_vystup),
-                    ("Krajská volební čísla (KVČ)", popisky["KROK3"], df_kvc_vystup),
-                    ("Mandáty přidělené v 1. skrutiniu", popisky["KROK4"], df_m1_vystup),
-                    ("Hlasy postupující do 2. skrutinia", popisky["KROK5"], df_z2_vystup),
-                    (f"Výpočet 2. skrutinia (RVČ = {rvc_hodnota:,})", popisky["KROK6"], df_f2_vystup),
-                    ("Finální rozdělení mandátů po obou skrutiniích", popisky["KROK7"], df_vysledek_vystup),
-                    ("Finálně nevyužité hlasy úspěšných stran", popisky["KROK8"], df_nevyuzite_final),
-                    ("Celková bilance hlasů", popisky["KROK9"], df_rozpis.set_index('Kategorie')),
-                    ("Efektivita hlasů (průměrná cena mandátu)", popisky["KROK10"], df_efektivita),
-                    ("Detailní přehled cen všech mandátů", popisky["KROK11"], df_ceny)
-                ]
-                current_row = 1
-                for title, text, df in all_sections:
-                    current_row = write_section(writer, sheet_calc, title, text, df, current_row)
-
-                worksheet = writer.sheets[sheet_calc]
-                worksheet.set_column('A:A', 35)
-                worksheet.set_column('B:R', 12)
-
-            print(f"\n✔ Analýza dokončena. Výsledky uloženy do: '{NAZEV_VYSTUPNIHO_SOUBORU}'")
+            popisky = {
+                "KROK1": f"Nejprve se rozdělí 200 mandátů mezi kraje dle odevzdaných hlasů. Použije se republikové mandátové číslo (RMČ), které pro tyto volby činí {rmc_hodnota:,} hlasů, a metoda největších zbytků.\nPočet hlasů v kraji se vydělí RMČ. Tím kraj získá první várku mandátů. Zbylé mandáty se pak přidělí krajům s největším zbytkem po tomto dělení.",
+                "KROK2": "Do výpočtu vstupují pouze hlasy pro strany, které na celostátní úrovni překročily 5% hranici. Hlasy pro ostatní strany propadají.",
+                "KROK3": "Pro každý kraj se spočítá unikátní krajské volební číslo (KVČ). Vypočítá se tak, že se součet hlasů úspěšných stran v daném kraji vydělí počtem mandátů pro tento kraj, zvětšeným o 2.",
+                "KROK4": "Počet mandátů pro stranu v kraji se určí tak, že se vezme počet hlasů dané strany v kraji, vydělí se krajským volebním číslem (KVČ) a výsledek se zaokrouhlí dolů na celé číslo.",
+                "KROK5": "Tato tabulka ukazuje hlasy, které nebyly využity v 1. kole a postupují do 2. kola. Podle zákona mají dvojí roli: slouží jak pro výpočet mandátů ve 2. kole, tak pro jejich následné umístění do krajů. V těchto konkrétních výsledcích jsou hodnoty pro oba účely totožné, protože žádná strana v žádném kraji nezůstala v 1. kole bez mandátu.",
+                "KROK6": f"Zde se sečtou všechny hlasy z předchozího kroku a rozdělí se jimi zbývající mandáty. Používá se republikové volební číslo (RVČ), které pro tyto volby činí {rvc_hodnota:,} hlasů, a metoda největších zbytků.",
+                "KROK7": "Toto je finální přehled rozdělení všech 200 mandátů. Tabulka sčítá mandáty získané v 1. skrutiniu s mandáty z 2. skrutinia, které byly na základě největších zbytků hlasů přiděleny do konkrétních krajů.",
+                "KROK8": "Hlasy úspěšných stran, které postoupily do 2. kola, ale ani zde nestačily na zisk mandátu. Jedná se o zbytky po dělení RVČ u stran, kterým nebyl přidělen mandát na základě pořadí zbytků.",
+                "KROK9": "Tato tabulka shrnuje, jak byly všechny odevzdané hlasy využity, kolik jich bylo potřeba na mandáty v jednotlivých fázích a kolik jich celkem propadlo nebo zůstalo nevyužito.",
+                "KROK10": "Tato tabulka ukazuje průměrný počet hlasů, který byl pro každou úspěšnou stranu potřeba k zisku jednoho mandátu. Nižší číslo znamená vyšší efektivitu přeměny hlasů na mandáty.",
+                "KROK11": "Tato tabulka ukazuje přesné 'ceny' všech 200 rozdělených mandátů. Cena mandátu z 1. kola je krajské volební číslo (KVČ). Cena mandátu z 2. kola je buď republikové volební číslo (RVČ), nebo výše zbytkového balíku hlasů, který mandát zajistil. Mandáty se stejnou cenou jsou sečteny.",
+                "KROK12": "Tato tabulka ukazuje, kolik hlasů navíc by strana v daném kraji potřebovala k zisku dalšího mandátu v tomto kraji (při nezměněných hlasech ostatních stran). Jde o nejmenší takový počet: protože zaokrouhlení KVČ, RVČ a RMČ může mandát přidat i ubrat, hodnota se hledá postupně po všech bodech, kde se rozdělení mandátů může změnit, a v každém se ověří přepočtem.",
+                "KROK13": "Tato tabulka ukazuje, o kolik hlasů by strana v daném kraji musela přijít, aby v tomto kraji ztratila mandát (nejmenší takový počet, hledaný stejně jako v předchozí tabulce). Prázdné pole znamená, že strana v kraji žádný mandát nemá."
+            }
+            all_sections = {
+                "KROK1": (f"Rozdělení mandátů mezi kraje (RMČ = {rmc_hodnota:,})", popisky["KROK1"], df_m_k_vystup),
+                "KROK2": ("Vstupní hlasy pro 1. skrutinium", popisky["KROK2"], df_hlasy_vystup),
+                "KROK3": ("Krajská volební čísla (KVČ)", popisky["KROK3"], df_kvc_vystup),
+                "KROK4": ("Mandáty přidělené v 1. skrutiniu", popisky["KROK4"], df_m1_vystup),
+                "KROK5": ("Hlasy postupující do 2. skrutinia", popisky["KROK5"], df_z2_vystup),
+                "KROK6": (f"Výpočet 2. skrutinia (RVČ = {rvc_hodnota:,})", popisky["KROK6"], df_f2_vystup),
+                "KROK7": ("Finální rozdělení mandátů po obou skrutiniích", popisky["KROK7"], df_vysledek_vystup),
+                "KROK8": ("Finálně nevyužité hlasy úspěšných stran", popisky["KROK8"], df_nevyuzite_final),
+                "KROK9": ("Celková bilance hlasů", popisky["KROK9"], df_rozpis.set_index('Kategorie')),
+                "KROK10": ("Efektivita hlasů (průměrná cena mandátu)", popisky["KROK10"], df_efektivita),
+                "KROK11": ("Detailní přehled cen všech mandátů", popisky["KROK11"], df_ceny)
+            }
+            if potrebne_hlasy:
+                all_sections["KROK12"] = ("Hlasy navíc potřebné k zisku dalšího mandátu", popisky["KROK12"], df_zisk)
+                all_sections["KROK13"] = ("Hlasy, jejichž ztráta by stála mandát", popisky["KROK13"], df_ztrata)
+            mezicas('zapis')
+            uloz_report(all_sections, vystupni_soubor, format_vystupu, constant_memory)
+            mezicas(None)
+
+            print(f"\n✔ Analýza dokončena. Výsledky uloženy do: '{vystupni_soubor}'")
+            return vysledek
         except PermissionError:
-            print(f"\n❌ CHYBA: Nelze uložit soubor '{NAZEV_VYSTUPNIHO_SOUBORU}'. Je pravděpodobně otevřen. Prosím, zavřete jej a spusťte skript znovu.")
+            print(f"\n❌ CHYBA: Nelze uložit soubor '{vystupni_soubor}'. Je pravděpodobně otevřen. Prosím, zavřete jej a spusťte skript znovu.")
         except Exception as e:
-            print(f"\n❌ Chyba při ukládání do Excelu: {e}")
+            print(f"\n❌ Chyba při ukládání výstupu: {e}")
 
     except FileNotFoundError as e:
         print(f"\n❌ CHYBA: Soubor s volebními výsledky nebyl nalezen: {e.filename}. Ujistěte se, že všechny potřebné .csv soubory jsou ve stejné složce jako skript.")
     except Exception as e:
         print(f"\nDošlo k závažné chybě: {e}")
+    finally:
+        mezicas(None)
 
 if __name__ == '__main__':
-    analyzuj_vysledky()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Analýza rozdělení mandátů ve volbách do PS 2025.')
+    parser.add_argument('-o', '--vystup', default=NAZEV_VYSTUPNIHO_SOUBORU, help='výstupní soubor (xlsx) nebo adresář (csv/json/parquet)')
+    parser.add_argument('--format', dest='format_vystupu', choices=['xlsx', 'csv', 'json', 'parquet'], default='xlsx')
+    parser.add_argument('--constant-memory', action='store_true', help='streamovaný zápis Excelu s nízkou pamětí')
+    parser.add_argument('--mereni', action='store_true', help='vypíše dobu a paměťovou špičku jednotlivých etap')
+    parser.add_argument('--potrebne-hlasy', action='store_true', help='přidá tabulky hlasů k zisku a ztrátě mandátu (KROK12, KROK13; pomalejší)')
+    args = parser.parse_args()
+    mereni = Mereni(pamet=True) if args.mereni else None
+    analyzuj_vysledky(args.vystup, args.format_vystupu, args.constant_memory, mereni=mereni, potrebne_hlasy=args.potrebne_hlasy)
+    if mereni is not None:
+        mereni.ukonci(); print(mereni.tabulka().to_string(float_format='{:.3f}'.format))
\ No newline at end of file
@@ -0,0 +1,129 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+from nacitani import atomicky_zapis
+from scrape_data_selenium import KRAJE, TARGET_DIR, uloz_tabulku, zpracuj_tabulku
+
+# --- KONFIGURACE ---
+ADRESAR_ARCHIVU = 'archiv_stranek'
+FORMAT_CASU = '%Y-%m-%dT%H:%M:%S'
+
+# Archiv stažených stránek: objekty/<2 znaky>/<sha256>.html.gz obsahují komprimované HTML (stejný obsah
+# se uloží jen jednou), index.jsonl zaznamenává každé stažení jako {nazev, cas, sha256, velikost}.
+
+
+class ArchivStranek:
+    """Komprimovaný archiv stránek adresovaný obsahem (SHA-256) s časovým indexem stažení po krajích."""
+
+    def __init__(self, adresar=ADRESAR_ARCHIVU):
+        self.adresar = adresar
+        self.cesta_indexu = os.path.join(adresar, 'index.jsonl')
+        self._zamek = threading.Lock()
+        os.makedirs(os.path.join(adresar, 'objekty'), exist_ok=True)
+
+    def _cesta_objektu(self, otisk):
+        return os.path.join(self.adresar, 'objekty', otisk[:2], f'{otisk}.html.gz')
+
+    def uloz(self, nazev, html, cas=None):
+        """Uloží stránku kraje `nazev` stažené v čase `cas` (výchozí teď, UTC); vrací otisk obsahu."""
+        data = html.encode('utf-8')
+        otisk = hashlib.sha256(data).hexdigest()
+        cesta = self._cesta_objektu(otisk)
+        if not os.path.exists(cesta):   # souběžné uložení téhož obsahu je neškodné, atomicky_zapis má vlastní dočasný soubor
+            os.makedirs(os.path.dirname(cesta), exist_ok=True)
+            atomicky_zapis(cesta, lambda f: f.write(gzip.compress(data, compresslevel=6)))
+        zaznam = {'nazev': nazev, 'cas': cas or time.strftime(FORMAT_CASU, time.gmtime()), 'sha256': otisk, 'velikost': len(data)}
+        with self._zamek, open(self.cesta_indexu, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(zaznam, ensure_ascii=False) + '\n')
+        return otisk
+
+    def nacti(self, otisk):
+        """Vrátí HTML uložené pod otiskem."""
+        with gzip.open(self._cesta_objektu(otisk), 'rb') as f:
+            return f.read().decode('utf-8')
+
+    def zaznamy(self, nazvy=None, do=None):
+        """Záznamy indexu seřazené podle času (volitelně jen zadané kraje a stažení nejpozději v čase `do`)."""
+        if not os.path.exists(self.cesta_indexu):
+            return []
+        with open(self.cesta_indexu, encoding='utf-8') as f:
+            zaznamy = [json.loads(radek) for radek in f if radek.strip()]
+        return sorted((z for z in zaznamy if (nazvy is None or z['nazev'] in nazvy) and (do is None or z['cas'] <= do)),
+                      key=lambda z: z['cas'])
+
+    def posledni(self, nazvy=None, do=None):
+        """Poslední stažení každého kraje (nejpozději v čase `do`) jako {nazev: záznam}."""
+        return {z['nazev']: z for z in self.zaznamy(nazvy, do)}
+
+
+# --- OBNOVA CSV ---
+
+def obnov_csv(archiv, do=None, nazvy=None, adresar=None):
+    """
+    Znovu vytvoří vysledky_ps2025_*.csv z posledních archivovaných stránek (nejpozději v čase `do`)
+    bez prohlížeče i sítě do adresáře (výchozí TARGET_DIR). Vrací seznam uložených cest.
+    """
+    cesty = []
+    os.makedirs(adresar or TARGET_DIR, exist_ok=True)
+    for nazev, zaznam in archiv.posledni(nazvy, do).items():
+        try:
+            cesty.append(uloz_tabulku(nazev, zpracuj_tabulku(nazev, archiv.nacti(zaznam['sha256'])), adresar))
+        except Exception as e:
+            print(f"❌ Nepodařilo se zpracovat stránku pro {nazev} ({zaznam['cas']}): {e}")
+    return cesty
+
+def obnov_vsechny_stavy(archiv, adresar, nazvy=None):
+    """
+    Přehraje celý archiv: pro každý čas stažení uloží do adresar/<cas>/ CSV všech krajů tak, jak byly
+    v tu chvíli známy. Každý unikátní obsah stránky se parsuje jen jednou. Vrací seznam vytvořených složek.
+    """
+    tabulky, stav, slozky = {}, {}, []
+    zaznamy = archiv.zaznamy(nazvy)
+    for i, zaznam in enumerate(zaznamy):
+        if zaznam['sha256'] not in tabulky:
+            try:
+                tabulky[zaznam['sha256']] = zpracuj_tabulku(zaznam['nazev'], archiv.nacti(zaznam['sha256']))
+            except Exception as e:
+                print(f"❌ Nepodařilo se zpracovat stránku pro {zaznam['nazev']} ({zaznam['cas']}): {e}")
+                tabulky[zaznam['sha256']] = None
+        if tabulky[zaznam['sha256']] is not None:
+            stav[zaznam['nazev']] = zaznam['sha256']
+        if i + 1 < len(zaznamy) and zaznamy[i + 1]['cas'] == zaznam['cas']:
+            continue
+        slozka = os.path.join(adresar, zaznam['cas'].replace(':', '-'))
+        os.makedirs(slozka, exist_ok=True)
+        for nazev, otisk in stav.items():
+            uloz_tabulku(nazev, tabulky[otisk], slozka)
+        slozky.append(slozka)
+    return slozky
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Archiv stažených stránek s výsledky a obnova CSV bez stahování.')
+    parser.add_argument('--archiv', default=ADRESAR_ARCHIVU)
+    podprikazy = parser.add_subparsers(dest='prikaz', required=True)
+    podprikazy.add_parser('seznam', help='vypíše stažení v archivu')
+    p_obnov = podprikazy.add_parser('obnov-csv', help='vytvoří CSV z posledních archivovaných stránek')
+    p_obnov.add_argument('--do', help=f'použije stav nejpozději v tomto čase (UTC, {FORMAT_CASU})')
+    p_obnov.add_argument('--cil', default=TARGET_DIR)
+    p_obnov.add_argument('--vsechny-stavy', action='store_true', help='uloží CSV pro každý čas stažení do --cil/<cas>/')
+    p_obnov.add_argument('--kraje', nargs='*', choices=list(KRAJE), default=None)
+    args = parser.parse_args()
+
+    archiv = ArchivStranek(args.archiv)
+    if args.prikaz == 'seznam':
+        zaznamy = archiv.zaznamy()
+        for z in zaznamy:
+            print(f"{z['cas']}  {z['nazev']:<22} {z['sha256'][:12]}  {z['velikost']:>9} B")
+        print(f"\n{len(zaznamy)} stažení, {len({z['sha256'] for z in zaznamy})} unikátních stránek.")
+    elif args.vsechny_stavy:
+        slozky = obnov_vsechny_stavy(archiv, args.cil, args.kraje)
+        print(f'✔ Obnoveno {len(slozky)} stavů do: {args.cil}')
+    else:
+        for cesta in obnov_csv(archiv, args.do, args.kraje, args.cil):
+            print(f'✔ Obnoveno: {cesta}')
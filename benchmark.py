@@ -0,0 +1,170 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from alokace import POCET_MANDATU, alokuj, procenta_hlasu
+from analyza import KRAJE_NAZVY, VOLEBNI_KLAUZULE, ZDROJE_VYSLEDKU, analyzuj_vysledky
+from mereni import Mereni
+from nacitani import nacti_vysledky
+from statistiky import bilance_hlasu, ceny_mandatu
+
+# --- KONFIGURACE ---
+SOUBOR_HISTORIE = 'benchmark_historie.jsonl'
+PRVKU_V_DAVCE = 4_000_000  # nejvýše scénářů × stran × krajů v jedné dávce alokace
+
+# Sady úloh (strany, kraje, scénáře).
+SADY = {
+    'rychla': [(5, 14, 1), (10, 14, 1_000), (20, 14, 10_000), (20, 200, 100)],
+    'plna': [(5, 14, 1), (10, 14, 1_000), (25, 14, 100_000), (50, 14, 10_000),
+             (20, 200, 1_000), (50, 1_000, 1), (50, 1_000, 1_000)],
+}
+
+
+# --- SYNTETICKÁ DATA ---
+
+def generuj_volby(rng, strany, kraje, scenare, velikost_kraje=(20_000, 1_500_000)):
+    """
+    Náhodné volby (scenare, strany, kraje) int64: celostátní podíly stran z Dirichletova rozdělení
+    s klesající koncentrací (několik velkých a mnoho malých stran), v krajích gamma šum kolem nich.
+    """
+    velikosti = rng.integers(*velikost_kraje, size=(scenare, 1, kraje))
+    podily = rng.dirichlet(8.0 / np.arange(1, strany + 1), size=scenare)[..., None]
+    podily = podily * rng.gamma(20.0, 1 / 20.0, size=(scenare, strany, kraje))
+    return np.floor(podily / podily.sum(axis=1, keepdims=True) * velikosti).astype(np.int64)
+
+def uspesne_strany(hlasy, klauzule=VOLEBNI_KLAUZULE):
+    """Strany nad klauzulí (podle celostátního podílu); nejsilnější strana projde vždy."""
+    celostatne = hlasy.sum(axis=-1)
+    uspesne = procenta_hlasu(celostatne) >= klauzule
+    uspesne[np.arange(len(hlasy)), celostatne.argmax(axis=-1)] = True
+    return uspesne
+
+# --- MĚŘENÍ ---
+
+def zmer_ulohu(strany, kraje, scenare, seed=None, pamet=False):
+    """
+    Změří alokaci a statistiky nad syntetickými volbami zpracovanými po dávkách. Vrací (Mereni, počet
+    scénářů, kde součet mandátů nesedí na POCET_MANDATU, počet scénářů, kde 1. skrutinium přidělilo
+    v některém kraji víc mandátů, než kraj má). Přebytek odečítá alokace (alokace.odecti_prebytek),
+    takže i tyto scénáře musí dát přesně POCET_MANDATU a jejich počet je jen informativní.
+    """
+    rng = np.random.default_rng(seed)
+    mereni = Mereni(pamet=pamet); chybne = prekrocene = 0
+    davka = max(1, PRVKU_V_DAVCE // (strany * kraje))
+    for zacatek in range(0, scenare, davka):
+        with mereni.etapa('generovani'):
+            hlasy = generuj_volby(rng, strany, kraje, min(davka, scenare - zacatek))
+            uspesne = uspesne_strany(hlasy)
+        vysledek = alokuj(hlasy, uspesne, mereni=mereni)
+        with mereni.etapa('statistiky'):
+            bilance_hlasu(vysledek); ceny_mandatu(vysledek)
+        hlasy_uspesnych = np.where(uspesne[..., None], hlasy, 0)
+        pred_odectenim = hlasy_uspesnych // np.maximum(vysledek.kvc, 1)[..., None, :]
+        prekroceno = (pred_odectenim.sum(axis=-2) > vysledek.mandaty_kraju).any(axis=-1)
+        chybne += int((vysledek.mandaty.sum(axis=(-2, -1)) != POCET_MANDATU).sum())
+        prekrocene += int(prekroceno.sum())
+    mereni.ukonci()
+    return mereni, chybne, prekrocene
+
+def zmer_analyzu(pamet=False):
+    """Změří celý běh analyzuj_vysledky nad dodanými CSV (report se zapíše do dočasné složky)."""
+    mereni = Mereni(pamet=pamet)
+    with tempfile.TemporaryDirectory() as adresar:
+        vysledek = analyzuj_vysledky(os.path.join(adresar, 'report.xlsx'), mereni=mereni)
+    mereni.ukonci()
+    return mereni, vysledek
+
+# --- SPRÁVNOST ---
+
+def over_spravnost(data=None):
+    """
+    Porovná mandáty stran spočtené alokací nad krajskými CSV s oficiálními mandáty ve vysledky_ps2025_Celkem.csv.
+    Vrací tabulku (oficiálně, spočteno) pro strany, které mají mandát alespoň v jednom z nich.
+    """
+    data = data if data is not None else nacti_vysledky(ZDROJE_VYSLEDKU)
+    celkem = data.soubory.index('Celkem')
+    uspesne = data.procenta[:, celkem] >= VOLEBNI_KLAUZULE
+    spocteno = alokuj(data.hlasy[:, data.sloupce(KRAJE_NAZVY)], uspesne).mandaty.sum(axis=-1)
+    df = pd.DataFrame({'oficialne': data.mandaty[:, celkem], 'spocteno': spocteno}, index=pd.Index(data.strany, name='Strana'))
+    return df[(df['oficialne'] > 0) | (df['spocteno'] > 0)]
+
+# --- HISTORIE ---
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def spust_sadu(sada='rychla', seed=0, pamet=False):
+    """Spustí všechny úlohy sady a analýzu dodaných CSV; vrací záznam pro historii."""
+    ulohy = []
+    for strany, kraje, scenare in SADY[sada]:
+        start = time.perf_counter()
+        mereni, chybne, prekrocene = zmer_ulohu(strany, kraje, scenare, seed, pamet)
+        celkem = time.perf_counter() - start
+        ulohy.append({'strany': strany, 'kraje': kraje, 'scenare': scenare, 'celkem_s': celkem,
+                      'scenaru_za_s': scenare / celkem, 'chybne_scenare': chybne, 'prekrocene_kraje': prekrocene,
+                      'etapy': mereni.tabulka().to_dict(orient='index')})
+    mereni, vysledek = zmer_analyzu(pamet)
+    if vysledek is None:
+        raise RuntimeError('analyzuj_vysledky nad dodanými CSV selhala')
+    return {'cas': time.strftime('%Y-%m-%dT%H:%M:%S'), 'commit': _commit(), 'sada': sada, 'seed': seed, 'pamet': pamet,
+            'python': platform.python_version(), 'numpy': np.__version__,
+            'ulohy': ulohy, 'analyza': mereni.tabulka().to_dict(orient='index')}
+
+def posledni_zaznam(cesta, sada):
+    """Poslední uložený běh dané sady z historie (nebo None)."""
+    zaznam = None
+    if os.path.exists(cesta):
+        with open(cesta, encoding='utf-8') as f:
+            for radek in f:
+                z = json.loads(radek)
+                zaznam = z if z['sada'] == sada else zaznam
+    return zaznam
+
+def tabulka_uloh(zaznam, predchozi=None):
+    """Přehled úloh běhu; s předchozím během i poměr časů (nový / předchozí)."""
+    df = pd.DataFrame([{'strany': u['strany'], 'kraje': u['kraje'], 'scenare': u['scenare'], 'celkem_s': u['celkem_s'],
+                        'scenaru_za_s': u['scenaru_za_s'], 'chybne_scenare': u['chybne_scenare'],
+                        'prekrocene_kraje': u['prekrocene_kraje'], **{f"{e}_s": v['cas_s'] for e, v in u['etapy'].items()}}
+                       for u in zaznam['ulohy']]).set_index(['strany', 'kraje', 'scenare'])
+    if predchozi is not None:
+        stare = pd.DataFrame([{'strany': u['strany'], 'kraje': u['kraje'], 'scenare': u['scenare'], 'celkem_s': u['celkem_s']}
+                              for u in predchozi['ulohy']]).set_index(['strany', 'kraje', 'scenare'])['celkem_s']
+        df['pomer'] = df['celkem_s'] / stare.reindex(df.index)
+    return df
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark alokace mandátů a analýzy po etapách.')
+    parser.add_argument('--sada', choices=list(SADY), default='rychla')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--pamet', action='store_true', help='měří i paměťovou špičku etap (tracemalloc, pomalejší)')
+    parser.add_argument('--historie', default=SOUBOR_HISTORIE, help='soubor JSONL, do kterého se běhy přidávají')
+    parser.add_argument('--bez-historie', action='store_true')
+    args = parser.parse_args()
+
+    df_spravnost = over_spravnost()
+    print(df_spravnost.to_string())
+    if not (df_spravnost['oficialne'] == df_spravnost['spocteno']).all():
+        raise SystemExit('\n❌ Alokace nereprodukuje oficiální rozdělení mandátů z vysledky_ps2025_Celkem.csv.')
+    print('\n✔ Alokace reprodukuje oficiální rozdělení mandátů.\n')
+
+    zaznam = spust_sadu(args.sada, args.seed, args.pamet)
+    predchozi = posledni_zaznam(args.historie, args.sada)
+    print(tabulka_uloh(zaznam, predchozi).to_string(float_format='{:.4f}'.format))
+    print('\nAnalýza dodaných CSV:')
+    print(pd.DataFrame.from_dict(zaznam['analyza'], orient='index').to_string(float_format='{:.4f}'.format))
+    if any(u['chybne_scenare'] for u in zaznam['ulohy']):
+        raise SystemExit(f"\n❌ Součet mandátů nesedí na {POCET_MANDATU}: {[u['chybne_scenare'] for u in zaznam['ulohy']]}")
+    if not args.bez_historie:
+        with open(args.historie, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(zaznam, ensure_ascii=False) + '\n')
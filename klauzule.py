@@ -0,0 +1,74 @@
+import argparse
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from alokace import POCET_MANDATU, alokuj, rozdel_mandaty_krajum
+from analyza import KRAJE_NAZVY, MAPOVANI_NAZVU_STRAN, ZDROJE_VYSLEDKU
+from nacitani import nacti_vysledky
+
+# --- KONFIGURACE ---
+# Kandidátní listiny koalic, pro které lze zadat samostatnou klauzuli
+KOALICE = ['SPOLU (ODS, KDU-ČSL, TOP 09)']
+
+
+def prohledej_klauzule(klauzule, koalicni_klauzule=None, koalice=KOALICE, data=None, pocet_mandatu=POCET_MANDATU):
+    """
+    Spočítá mandáty stran pro mřížku klauzulí bez opakování celé analýzy.
+
+    klauzule:          posloupnost klauzulí (v %) pro samostatné strany.
+    koalicni_klauzule: posloupnost klauzulí pro listiny v `koalice`; None = stejná klauzule jako ostatní.
+    Postoupí-li méně než 2 listiny, sníží se všechny klauzule bodu o 1 procentní bod (bod 5 postupu ČSÚ),
+    případně opakovaně; o kolik, uvádí sloupec 'Snížení klauzule'.
+    Rozdělení mandátů krajům nezávisí na klauzuli, počítá se tedy jen jednou. Body mřížky se stejnou
+    množinou úspěšných stran sdílejí jednu alokaci; všechny unikátní množiny se alokují jedním dávkovým
+    voláním. Vrací tabulku (klauzule[, koaliční klauzule]) → mandáty stran.
+    """
+    data = data if data is not None else nacti_vysledky(ZDROJE_VYSLEDKU)
+    hlasy = data.hlasy[:, data.sloupce(KRAJE_NAZVY)]
+    procenta = data.procenta[:, data.soubory.index('Celkem')]
+    je_koalice = np.isin(data.strany, koalice)
+    mandaty_kraju, _ = rozdel_mandaty_krajum(hlasy.sum(axis=0), pocet_mandatu)
+
+    if koalicni_klauzule is None:
+        body = [(k, k) for k in klauzule]
+    else:
+        body = list(itertools.product(klauzule, koalicni_klauzule))
+    meze = np.array([np.where(je_koalice, kk, k) for k, kk in body], dtype=float).reshape(len(body), len(data.strany))
+    snizeni = np.zeros(len(body), dtype=np.int64)
+    while True:
+        malo = ((procenta >= meze - snizeni[:, None]).sum(axis=1) < 2) & (meze.max(axis=1) - snizeni > 0)
+        if not malo.any():
+            break
+        snizeni += malo
+    masky = procenta >= meze - snizeni[:, None]
+    unikatni, prirazeni = np.unique(masky, axis=0, return_inverse=True)
+
+    vysledek = alokuj(np.broadcast_to(hlasy, (len(unikatni),) + hlasy.shape), unikatni, mandaty_kraju=mandaty_kraju,
+                      pocet_mandatu=pocet_mandatu)
+    mandaty = vysledek.mandaty.sum(axis=-1)[prirazeni.ravel()]
+    if (mandaty.sum(axis=1) != pocet_mandatu).any():
+        raise ValueError('Součet mandátů některého bodu mřížky nesedí na počet mandátů')
+
+    if koalicni_klauzule is None:
+        index = pd.Index([k for k, _ in body], name='Klauzule')
+    else:
+        index = pd.MultiIndex.from_tuples(body, names=['Klauzule', 'Koaliční klauzule'])
+    df = pd.DataFrame(mandaty, index=index, columns=data.strany)
+    df = df.loc[:, df.any()].rename(columns=MAPOVANI_NAZVU_STRAN)
+    df['Počet stran'] = (df > 0).sum(axis=1)
+    df['Snížení klauzule'] = snizeni
+    return df
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Mandáty stran pro mřížku volebních klauzulí.')
+    parser.add_argument('--od', type=float, default=3.0)
+    parser.add_argument('--do', type=float, default=7.0)
+    parser.add_argument('--krok', type=float, default=0.5)
+    parser.add_argument('--koalicni', type=float, nargs='*', default=None, help='klauzule pro koalice (např. 5 8 11)')
+    args = parser.parse_args()
+
+    mrizka = np.round(np.arange(args.od, args.do + args.krok / 2, args.krok), 2)
+    print(prohledej_klauzule(mrizka, args.koalicni).to_string())
@@ -0,0 +1,73 @@
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+import pandas as pd
+
+# Volitelné měření doby a paměti jednotlivých etap výpočtu. Funkce přijímají mereni=None
+# (nic se neměří) nebo instanci Mereni, do které se etapy zapisují.
+
+
+class Mereni:
+    """
+    Sbírá dobu běhu (a s pamet=True špičku alokované paměti přes tracemalloc) pojmenovaných etap.
+    Opakované etapy se sčítají. hook(nazev, sekundy, bajty) se volá po dokončení každé etapy.
+    """
+
+    def __init__(self, pamet=False, hook=None):
+        self.pamet = pamet
+        self.hook = hook
+        self.etapy = {}          # název -> {'cas_s', 'pamet_mb', 'volani'}
+        self._zasobnik = []
+        self._otevrena = None    # kontext etapy otevřené přes mezicas()
+        self._spustil_tracemalloc = False
+
+    def _aktualizuj_spicky(self):
+        _, spicka = tracemalloc.get_traced_memory()
+        for zaznam in self._zasobnik:
+            zaznam['spicka'] = max(zaznam['spicka'], spicka)
+
+    @contextmanager
+    def etapa(self, nazev):
+        """Změří blok kódu jako etapu `nazev`; etapy lze vnořovat."""
+        if self.pamet and not tracemalloc.is_tracing():
+            tracemalloc.start(); self._spustil_tracemalloc = True
+        if self.pamet:
+            self._aktualizuj_spicky(); tracemalloc.reset_peak()
+            aktualni, _ = tracemalloc.get_traced_memory()
+            self._zasobnik.append({'start': aktualni, 'spicka': aktualni})
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            cas = time.perf_counter() - start
+            pamet = 0
+            if self.pamet:
+                self._aktualizuj_spicky(); zaznam = self._zasobnik.pop(); tracemalloc.reset_peak()
+                pamet = zaznam['spicka'] - zaznam['start']
+            stav = self.etapy.setdefault(nazev, {'cas_s': 0.0, 'pamet_mb': 0.0, 'volani': 0})
+            stav['cas_s'] += cas; stav['pamet_mb'] = max(stav['pamet_mb'], pamet / 2**20); stav['volani'] += 1
+            if self.hook is not None:
+                self.hook(nazev, cas, pamet)
+
+    def mezicas(self, nazev=None):
+        """Ukončí etapu otevřenou předchozím voláním a zahájí etapu `nazev` (None = jen ukončí)."""
+        if self._otevrena is not None:
+            self._otevrena.__exit__(None, None, None); self._otevrena = None
+        if nazev is not None:
+            self._otevrena = self.etapa(nazev); self._otevrena.__enter__()
+
+    def ukonci(self):
+        """Ukončí otevřenou etapu a vypne tracemalloc, pokud ho zapnulo toto měření."""
+        self.mezicas(None)
+        if self._spustil_tracemalloc:
+            tracemalloc.stop(); self._spustil_tracemalloc = False
+
+    def tabulka(self):
+        """Souhrn etap jako tabulka (index etapa; sloupce cas_s, pamet_mb, volani)."""
+        return pd.DataFrame.from_dict(self.etapy, orient='index', columns=['cas_s', 'pamet_mb', 'volani']).rename_axis('etapa')
+
+
+def etapa(mereni, nazev):
+    """Kontext etapy `nazev`, nebo prázdný kontext, pokud se neměří."""
+    return mereni.etapa(nazev) if mereni is not None else nullcontext()
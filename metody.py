@@ -0,0 +1,88 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from alokace import alokuj, odecti_prebytek, poradi_sestupne, rozdel_mandaty_krajum
+from analyza import KRAJE_NAZVY, MAPOVANI_NAZVU_STRAN, VOLEBNI_KLAUZULE, ZDROJE_VYSLEDKU
+from nacitani import nacti_vysledky
+
+# Každá metoda má tvar metoda(hlasy, mandaty_kraju) -> mandáty, kde hlasy jsou int64 (..., S, K)
+# (jen strany, které prošly klauzulí), mandaty_kraju (..., K) a výsledek (..., S, K).
+
+
+def metoda_delitelu(delitel):
+    """
+    Vytvoří metodu nejvyšších podílů pro posloupnost dělitelů delitel(j), j = 0, 1, 2, ...
+    Všechny podíly všech krajů se seřadí jediným vektorovým tříděním; kraj k získá svých
+    mandaty_kraju[k] nejvyšších podílů.
+    """
+    def metoda(hlasy, mandaty_kraju):
+        hlasy = np.asarray(hlasy, dtype=np.int64); mandaty_kraju = np.asarray(mandaty_kraju)
+        S = hlasy.shape[-2]; J = max(int(mandaty_kraju.max(initial=0)), 1)
+        podily = hlasy[..., None] / delitel(np.arange(J))                      # (..., S, K, J)
+        podily = np.moveaxis(podily, -2, -3).reshape(hlasy.shape[:-2] + (hlasy.shape[-1], S * J))
+        ziskane = poradi_sestupne(podily) < mandaty_kraju[..., None]          # (..., K, S*J)
+        mandaty = ziskane.reshape(ziskane.shape[:-1] + (S, J)).sum(axis=-1)    # (..., K, S)
+        return np.swapaxes(mandaty, -1, -2).astype(np.int64)
+    return metoda
+
+def metoda_kvoty(kvota):
+    """
+    Vytvoří kvótovou metodu s největšími zbytky; kvota(hlasy_kraje, mandaty_kraju) vrací kvótu pro každý kraj.
+    Dá-li kvóta víc mandátů, než kraj má (Imperiali), přebytek se odečte stranám s nejmenšími zbytky
+    stejně jako v 1. skrutiniu (alokace.odecti_prebytek).
+    """
+    def metoda(hlasy, mandaty_kraju):
+        hlasy = np.asarray(hlasy, dtype=np.int64); mandaty_kraju = np.asarray(mandaty_kraju)
+        q = kvota(hlasy.sum(axis=-2), mandaty_kraju).astype(float)
+        q = np.where((q > 0) & (mandaty_kraju > 0), q, np.inf)
+        mandaty = np.floor(hlasy / q[..., None, :]).astype(np.int64)
+        zbytky = hlasy - mandaty * np.where(np.isinf(q), 0, q)[..., None, :]
+        mandaty, zbytky = odecti_prebytek(hlasy, mandaty, zbytky, np.where(np.isinf(q), 0, q), mandaty_kraju)
+        zbyva = mandaty_kraju - mandaty.sum(axis=-2)
+        return mandaty + (poradi_sestupne(zbytky, axis=-2) < zbyva[..., None, :])
+    return metoda
+
+def metoda_zakona(hlasy, mandaty_kraju):
+    """Postup podle zákona: Imperiali v krajích (1. skrutinium) a RVČ s největšími zbytky (2. skrutinium)."""
+    return alokuj(hlasy, mandaty_kraju=mandaty_kraju).mandaty
+
+
+METODY = {
+    "D'Hondt": metoda_delitelu(lambda j: j + 1),
+    'Sainte-Laguë': metoda_delitelu(lambda j: 2 * j + 1),
+    'Hare': metoda_kvoty(lambda v, m: v / np.maximum(m, 1)),
+    'Droop': metoda_kvoty(lambda v, m: v // (m + 1) + 1),
+    'Imperiali': metoda_kvoty(lambda v, m: np.rint(v / (m + 2))),
+    'Zákon (Imperiali + 2. skrutinium)': metoda_zakona,
+}
+
+
+def rozdel_metodami(hlasy, mandaty_kraju, metody=None):
+    """Rozdělí stejné hlasy (..., S, K) všemi zadanými metodami; vrací {název metody: mandáty (..., S, K)}."""
+    return {nazev: METODY[nazev](hlasy, mandaty_kraju) for nazev in (metody or METODY)}
+
+def porovnej_metody(metody=None, data=None, klauzule=VOLEBNI_KLAUZULE):
+    """
+    Srovnávací tabulka metod × strany (celkové mandáty) pro načtené výsledky. Rozdělení mandátů
+    krajům a klauzule jsou pro všechny metody stejné jako v analyzuj_vysledky.
+    """
+    data = data if data is not None else nacti_vysledky(ZDROJE_VYSLEDKU)
+    hlasy = data.hlasy[:, data.sloupce(KRAJE_NAZVY)]
+    uspesne = data.procenta[:, data.soubory.index('Celkem')] >= klauzule
+    mandaty_kraju, _ = rozdel_mandaty_krajum(hlasy.sum(axis=0))
+
+    vysledky = rozdel_metodami(hlasy[uspesne], mandaty_kraju, metody)
+    strany = [MAPOVANI_NAZVU_STRAN.get(s, s) for s in np.asarray(data.strany, dtype=object)[uspesne]]
+    df = pd.DataFrame({nazev: m.sum(axis=-1) for nazev, m in vysledky.items()}, index=strany).T
+    df.index.name = 'Metoda'
+    return df
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Srovnání metod přepočtu hlasů na mandáty.')
+    parser.add_argument('--metody', nargs='*', choices=list(METODY), default=None)
+    parser.add_argument('--klauzule', type=float, default=VOLEBNI_KLAUZULE)
+    args = parser.parse_args()
+    print(porovnej_metody(args.metody, klauzule=args.klauzule).to_string())
@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import threading
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+# --- KONFIGURACE ---
+VZOR_SOUBORU = 'vysledky_ps2025_{}.csv'
+ADRESAR_CACHE = '.cache_vysledky'
+POLE = ('hlasy', 'procenta', 'mandaty', 'pritomnost')
+
+
+class VolebniData(NamedTuple):
+    """Výsledky všech zdrojových souborů v jedné struktuře strany × soubory se stabilním pořadím stran."""
+    strany: list               # názvy stran v pořadí prvního výskytu
+    soubory: list              # názvy zdrojů (Celkem, kraje, Zahranici)
+    hlasy: np.ndarray          # (S, F) int64
+    procenta: np.ndarray       # (S, F) float64
+    mandaty: np.ndarray        # (S, F) int64
+    pritomnost: np.ndarray     # (S, F) bool, zda strana v daném souboru vůbec je
+
+    def sloupce(self, nazvy):
+        """Vrátí indexy sloupců pro zadané názvy zdrojů."""
+        return [self.soubory.index(n) for n in nazvy]
+
+    def tabulka(self, nazev):
+        """Vrátí výsledky jednoho zdroje ve tvaru původního CSV."""
+        j = self.soubory.index(nazev); radky = self.pritomnost[:, j]
+        return pd.DataFrame({
+            'nazev_strany': np.asarray(self.strany, dtype=object)[radky],
+            'hlasy_celkem': self.hlasy[radky, j],
+            'hlasy_procenta': self.procenta[radky, j],
+            'mandaty_pocet': self.mandaty[radky, j]
+        })
+
+# --- POMOCNÉ FUNKCE ---
+
+def _otisk(cesta):
+    """SHA-256 obsahu souboru."""
+    with open(cesta, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def _nacti_csv(cesta):
+    """Načte jedno CSV vytvořené scraperem."""
+    df = pd.read_csv(cesta, sep=';')
+    return df['nazev_strany'].tolist(), df['hlasy_celkem'].to_numpy(np.int64), df['hlasy_procenta'].to_numpy(float), df['mandaty_pocet'].to_numpy(np.int64)
+
+def _nacti_cache(adresar):
+    """
+    Načte manifest a pole z cache (pole jako memory-mapped). Při chybě (i poškozeném manifestu bez
+    očekávaných klíčů) vrátí prázdnou cache.
+    """
+    try:
+        with open(os.path.join(adresar, 'manifest.json'), encoding='utf-8') as f:
+            manifest = json.load(f)
+        pole = {p: np.load(os.path.join(adresar, f'{p}.npy'), mmap_mode='r') for p in POLE}
+        tvar = (len(manifest['strany']), len(manifest['soubory']))
+        if any(not {'mtime_ns', 'velikost', 'sha256'} <= set(z) for z in manifest['soubory'].values()):
+            return {}, None
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return {}, None
+    if any(a.shape != tvar for a in pole.values()):
+        return {}, None
+    return manifest, pole
+
+def atomicky_zapis(cesta, zapis, rezim='wb', **kwargs):
+    """
+    Zapíše soubor přes dočasný soubor, aby souběžné čtení nikdy nevidělo rozepsaná data. Dočasný soubor je
+    jedinečný pro proces i vlákno, takže souběžné zápisy téhož souboru si ho navzájem nepřepíšou ani nepřesunou.
+    """
+    docasny = f'{cesta}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        with open(docasny, rezim, **kwargs) as f:
+            zapis(f)
+        os.replace(docasny, cesta)
+    except BaseException:
+        if os.path.exists(docasny):
+            os.remove(docasny)
+        raise
+
+def _uloz_cache(adresar, manifest, pole):
+    """Uloží pole (pokud jsou zadána) a manifest; manifest se zapisuje až nakonec."""
+    os.makedirs(adresar, exist_ok=True)
+    for p in POLE if pole is not None else ():
+        atomicky_zapis(os.path.join(adresar, f'{p}.npy'), lambda f: np.save(f, pole[p]))
+    atomicky_zapis(os.path.join(adresar, 'manifest.json'), lambda f: json.dump(manifest, f, ensure_ascii=False, indent=1),
+                    rezim='w', encoding='utf-8')
+
+# --- HLAVNÍ FUNKCE ---
+
+def nacti_vysledky(nazvy, slozka='.', cache=True, adresar_cache=ADRESAR_CACHE):
+    """
+    Načte soubory vysledky_ps2025_{nazev}.csv do jedné struktury VolebniData; každý soubor se parsuje
+    nejvýše jednou. S cache se struktura ukládá jako .npy pole (načítaná přes mmap) s manifestem
+    mtime/velikostí/SHA-256 zdrojů. Při dalším běhu se znovu parsují jen soubory, jejichž obsah se změnil.
+    Cache je společná pro všechny seznamy nazvy: nové zdroje se do ní přidávají jako další sloupce a sloupce
+    zdrojů, které volání nepožaduje, v ní zůstávají.
+    """
+    adresar = os.path.join(slozka, adresar_cache)
+    manifest, stara_pole = _nacti_cache(adresar) if cache else ({}, None)
+    strany = list(manifest.get('strany', []))
+    stare_soubory = manifest.get('soubory', {})
+    stare_poradi = list(stare_soubory)
+
+    novy_manifest, zparsovano, manifest_zmenen = dict(stare_soubory), {}, False
+    for nazev in nazvy:
+        cesta = os.path.join(slozka, VZOR_SOUBORU.format(nazev))
+        st = os.stat(cesta)
+        zaznam = stare_soubory.get(nazev) if stara_pole is not None else None
+        if zaznam and zaznam['mtime_ns'] == st.st_mtime_ns and zaznam['velikost'] == st.st_size:
+            continue
+        otisk = _otisk(cesta); manifest_zmenen = True
+        novy_manifest[nazev] = {'mtime_ns': st.st_mtime_ns, 'velikost': st.st_size, 'sha256': otisk}
+        if zaznam and zaznam['sha256'] == otisk:
+            continue
+        zparsovano[nazev] = _nacti_csv(cesta)
+        strany += [s for s in dict.fromkeys(zparsovano[nazev][0]) if s not in strany]
+
+    soubory = list(novy_manifest)
+    if not zparsovano:
+        if manifest_zmenen:
+            _uloz_cache(adresar, {'strany': strany, 'soubory': novy_manifest}, None)
+        if stare_poradi == list(nazvy):
+            return VolebniData(strany, list(nazvy), *(stara_pole[p] for p in POLE))
+        sloupce = [soubory.index(n) for n in nazvy]
+        return VolebniData(strany, list(nazvy), *(np.asarray(stara_pole[p][:, sloupce]) for p in POLE))
+
+    S, F = len(strany), len(soubory)
+    pole = {'hlasy': np.zeros((S, F), np.int64), 'procenta': np.zeros((S, F), float),
+            'mandaty': np.zeros((S, F), np.int64), 'pritomnost': np.zeros((S, F), bool)}
+    index_stran = {s: i for i, s in enumerate(strany)}
+    for j, nazev in enumerate(soubory):
+        if nazev in zparsovano:
+            jmena, hlasy, procenta, mandaty = zparsovano[nazev]
+            radky = [index_stran[s] for s in jmena]
+            pole['hlasy'][radky, j] = hlasy; pole['procenta'][radky, j] = procenta
+            pole['mandaty'][radky, j] = mandaty; pole['pritomnost'][radky, j] = True
+        else:
+            stary = stare_poradi.index(nazev); s_stare = stara_pole['hlasy'].shape[0]
+            for p in POLE:
+                pole[p][:s_stare, j] = stara_pole[p][:, stary]
+    del stara_pole
+
+    if cache:
+        _uloz_cache(adresar, {'strany': strany, 'soubory': novy_manifest}, pole)
+    if soubory != list(nazvy):
+        sloupce = [soubory.index(n) for n in nazvy]
+        pole = {p: a[:, sloupce] for p, a in pole.items()}
+    return VolebniData(strany, list(nazvy), *(pole[p] for p in POLE))
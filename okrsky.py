@@ -0,0 +1,205 @@
+import argparse
+import os
+import xml.etree.ElementTree as ET
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from alokace import procenta_hlasu
+from analyza import KRAJE_NAZVY, ZDROJE_VYSLEDKU, analyzuj_vysledky
+from nacitani import VolebniData
+from scrape_data_selenium import KRAJE, uloz_tabulku
+
+# --- KONFIGURACE ---
+VELIKOST_DAVKY = 500_000  # řádků (záznamů hlasů) zpracovaných najednou
+
+# Názvy sloupců (CSV) a atributů (XML) v otevřených datech ČSÚ; 'obec' je nepovinná.
+SLOUPCE_CSV = {'okres': 'OKRES', 'obec': 'OBEC', 'strana': 'KSTRANA', 'hlasy': 'POC_HLASU'}
+SLOUPCE_XML = {'okres': 'CIS_OKRES', 'obec': 'CIS_OBEC', 'strana': 'KSTRANA', 'hlasy': 'HLASY'}
+ELEMENT_HLASU = 'HLASY_STRANA'
+
+NAZVY_KRAJU = {kod: nazev for nazev, kod in KRAJE.items() if kod}
+
+# Každá dávka je čtveřice int64 polí stejné délky (okres, obec, strana, hlasy); chybějící obec je -1.
+
+
+def kod_kraje(okres):
+    """Kód kraje (jako v KRAJE) z číselného kódu okresu, např. 2101 -> '2100', 9999 (zahraničí) -> '9900'."""
+    return f'{int(okres) // 100:02d}00'
+
+def nacti_ciselnik_stran(cesta, sep=',', encoding='utf-8', kod='KSTRANA', nazev='NAZEV_STRK'):
+    """Načte číselník stran (např. psrkl.csv) jako slovník {kód strany: název}."""
+    df = pd.read_csv(cesta, sep=sep, encoding=encoding, usecols=[kod, nazev])
+    return dict(zip(df[kod].astype(np.int64).tolist(), df[nazev].tolist()))
+
+# --- ČTENÍ PO DÁVKÁCH ---
+
+def cti_csv(cesta, sloupce=SLOUPCE_CSV, velikost_davky=VELIKOST_DAVKY, sep=',', encoding='utf-8'):
+    """Čte CSV s hlasy v dlouhém tvaru (jeden řádek = strana v okrsku/obci) po dávkách; načítá jen potřebné sloupce."""
+    pouzite = [sloupce[k] for k in ('okres', 'obec', 'strana', 'hlasy') if sloupce.get(k)]
+    for davka in pd.read_csv(cesta, sep=sep, encoding=encoding, usecols=pouzite, dtype=np.int64, chunksize=velikost_davky):
+        obec = davka[sloupce['obec']].to_numpy() if sloupce.get('obec') else np.full(len(davka), -1, np.int64)
+        yield davka[sloupce['okres']].to_numpy(), obec, davka[sloupce['strana']].to_numpy(), davka[sloupce['hlasy']].to_numpy()
+
+def cti_xml(cesta, sloupce=SLOUPCE_XML, velikost_davky=VELIKOST_DAVKY, element=ELEMENT_HLASU):
+    """
+    Čte XML s hlasy proudově (iterparse) po dávkách. Každý element `element` (bez ohledu na jmenný prostor)
+    je jeden záznam; okres, obec, strana a hlasy se hledají v jeho atributech a v atributech nadřazených
+    elementů (např. <OKRSEK CIS_OBEC=...>). Zpracované elementy se hned uvolňují.
+    """
+    kontext, zaznamy = [{}], []
+    for udalost, el in ET.iterparse(cesta, events=('start', 'end')):
+        if udalost == 'start':
+            kontext.append({**kontext[-1], **el.attrib})
+            continue
+        atributy = kontext.pop()
+        if el.tag.rpartition('}')[2] == element:
+            zaznamy.append(tuple(atributy.get(sloupce.get(k), -1) for k in ('okres', 'obec', 'strana', 'hlasy')))
+            if len(zaznamy) >= velikost_davky:
+                yield tuple(np.array(zaznamy, dtype=np.int64).T); zaznamy = []
+        el.clear()
+    if zaznamy:
+        yield tuple(np.array(zaznamy, dtype=np.int64).T)
+
+# --- AGREGACE ---
+
+class AgregovaneHlasy(NamedTuple):
+    """Hlasy sečtené po okresech (a volitelně obcích); kraje, celkem i drill-down se z nich jen sčítají."""
+    strany: list                 # kódy stran vzestupně
+    okresy: list                 # kódy okresů vzestupně
+    hlasy_okresu: np.ndarray     # (S, O) int64
+    obce: list                   # kódy obcí vzestupně (prázdné bez agregace po obcích)
+    okres_obce: np.ndarray       # (M,) kód okresu každé obce
+    hlasy_obci: np.ndarray       # (S, M) int64
+
+    def hlasy_kraju(self, kody=tuple(NAZVY_KRAJU)):
+        """Hlasy stran po krajích (S, len(kody)) v pořadí zadaných kódů krajů."""
+        kraj_okresu = [kod_kraje(o) for o in self.okresy]
+        sloupce = np.array([list(kody).index(k) if k in kody else len(kody) for k in kraj_okresu], dtype=np.intp)
+        hlasy = np.zeros((len(self.strany), len(kody) + 1), np.int64)
+        np.add.at(hlasy, (slice(None), sloupce), self.hlasy_okresu)
+        return hlasy[:, :-1]
+
+    def volebni_data(self, nazvy_stran=None):
+        """
+        Převede hlasy na VolebniData se zdroji ZDROJE_VYSLEDKU (Celkem, kraje, Zahranici), aby nad nimi šla
+        spustit stejná analýza jako nad CSV ze scraperu. Procenta se dopočtou oříznutím na 2 desetinná místa
+        (stejně jako na volby.cz), mandáty jsou 0.
+        """
+        kody = [KRAJE[n] for n in ZDROJE_VYSLEDKU[1:]]
+        hlasy_kraju = self.hlasy_kraju(kody)
+        hlasy = np.column_stack([self.hlasy_okresu.sum(axis=1), hlasy_kraju])
+        procenta = procenta_hlasu(hlasy, axis=0)
+        pritomnost = hlasy > 0; pritomnost[:, 0] = True
+        return VolebniData(self._nazvy(nazvy_stran), list(ZDROJE_VYSLEDKU), hlasy, procenta, np.zeros_like(hlasy), pritomnost)
+
+    def tabulka_okresu(self, nazvy_stran=None):
+        """Drill-down: hlasy stran po okresech, řádky (kraj, okres)."""
+        index = pd.MultiIndex.from_arrays([[NAZVY_KRAJU.get(kod_kraje(o)) for o in self.okresy], self.okresy], names=['kraj', 'okres'])
+        return pd.DataFrame(self.hlasy_okresu.T, index=index, columns=self._nazvy(nazvy_stran))
+
+    def tabulka_obci(self, nazvy_stran=None):
+        """Drill-down: hlasy stran po obcích, řádky (kraj, okres, obec)."""
+        index = pd.MultiIndex.from_arrays([[NAZVY_KRAJU.get(kod_kraje(o)) for o in self.okres_obce], self.okres_obce, self.obce],
+                                          names=['kraj', 'okres', 'obec'])
+        return pd.DataFrame(self.hlasy_obci.T, index=index, columns=self._nazvy(nazvy_stran))
+
+    def _nazvy(self, nazvy_stran):
+        return [nazvy_stran.get(s, str(s)) for s in self.strany] if nazvy_stran else [str(s) for s in self.strany]
+
+
+class Agregace:
+    """
+    Průběžně sčítá dávky záznamů do kompaktních int64 matic strany × okresy (a strany × obce).
+    Paměť závisí jen na počtu stran a územních jednotek, ne na počtu řádků vstupu.
+    """
+
+    def __init__(self, podle_obci=False):
+        self.podle_obci = podle_obci
+        self.strany, self.okresy, self.obce = {}, {}, {}   # kód -> index řádku/sloupce
+        self.okres_obce = {}
+        self.hlasy_okresu = np.zeros((0, 0), np.int64)
+        self.hlasy_obci = np.zeros((0, 0), np.int64)
+        self.zaznamu = 0
+
+    @staticmethod
+    def _indexy(slovnik, kody):
+        """Přiřadí kódům indexy (nové kódy dostanou další volné) a vrátí je jako pole."""
+        unikatni, inverzni = np.unique(kody, return_inverse=True)
+        return np.array([slovnik.setdefault(k, len(slovnik)) for k in unikatni.tolist()], dtype=np.intp)[inverzni]
+
+    @staticmethod
+    def _pricti(matice, radky, sloupce, hlasy, tvar):
+        """Přičte hlasy do matice (zvětšené na `tvar`, pokud přibyly strany nebo jednotky)."""
+        if matice.shape != tvar:
+            vetsi = np.zeros(tvar, np.int64); vetsi[:matice.shape[0], :matice.shape[1]] = matice; matice = vetsi
+        matice += np.bincount(radky * tvar[1] + sloupce, weights=hlasy, minlength=tvar[0] * tvar[1]).astype(np.int64).reshape(tvar)
+        return matice
+
+    def pridej(self, okresy, obce, strany, hlasy):
+        """Přičte jednu dávku záznamů."""
+        radky = self._indexy(self.strany, strany)
+        self.hlasy_okresu = self._pricti(self.hlasy_okresu, radky, self._indexy(self.okresy, okresy), hlasy,
+                                         (len(self.strany), len(self.okresy)))
+        if self.podle_obci:
+            self.okres_obce.update(zip(obce.tolist(), okresy.tolist()))
+            self.hlasy_obci = self._pricti(self.hlasy_obci, radky, self._indexy(self.obce, obce), hlasy,
+                                           (len(self.strany), len(self.obce)))
+        self.zaznamu += len(hlasy)
+
+    def vysledek(self):
+        """Vrátí AgregovaneHlasy se stranami, okresy a obcemi seřazenými podle kódu."""
+        def serad(slovnik):
+            kody = sorted(slovnik)
+            return kody, [slovnik[k] for k in kody]
+        strany, rs = serad(self.strany); okresy, ro = serad(self.okresy); obce, rm = serad(self.obce)
+        hlasy_obci = self.hlasy_obci[np.ix_(rs, rm)] if self.podle_obci else np.zeros((len(strany), 0), np.int64)
+        return AgregovaneHlasy(strany, okresy, self.hlasy_okresu[np.ix_(rs, ro)], obce,
+                               np.array([self.okres_obce[o] for o in obce], dtype=np.int64), hlasy_obci)
+
+# --- HLAVNÍ FUNKCE ---
+
+def agreguj(cesty, podle_obci=False, velikost_davky=VELIKOST_DAVKY, sloupce=None, **kwargs_csv):
+    """
+    Jedním průchodem přečte soubory s výsledky za okrsky nebo obce (.csv nebo .xml, lze kombinovat)
+    a sečte hlasy po okresech (s podle_obci i po obcích). Vstup se nikdy nenačítá celý, v paměti je
+    vždy nejvýše jedna dávka. kwargs_csv (sep, encoding) se předávají čtení CSV.
+    """
+    agregace = Agregace(podle_obci)
+    for cesta in [cesty] if isinstance(cesty, (str, os.PathLike)) else cesty:
+        if str(cesta).lower().endswith('.xml'):
+            davky = cti_xml(cesta, sloupce or SLOUPCE_XML, velikost_davky)
+        else:
+            davky = cti_csv(cesta, sloupce or SLOUPCE_CSV, velikost_davky, **kwargs_csv)
+        for davka in davky:
+            agregace.pridej(*davka)
+    return agregace.vysledek()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Agregace výsledků za okrsky/obce (otevřená data ČSÚ) do krajů.')
+    parser.add_argument('soubory', nargs='+', help='soubory .csv nebo .xml s hlasy za okrsky nebo obce')
+    parser.add_argument('--ciselnik', help='číselník stran (např. psrkl.csv) pro názvy stran')
+    parser.add_argument('--sep', default=',')
+    parser.add_argument('--encoding', default='utf-8')
+    parser.add_argument('--okresy', help='uloží drill-down po okresech do zadaného CSV')
+    parser.add_argument('--obce', help='uloží drill-down po obcích do zadaného CSV')
+    parser.add_argument('--ulozit-csv', action='store_true', help='uloží vysledky_ps2025_*.csv jako scraper')
+    parser.add_argument('--analyza', action='store_true', help='spustí analýzu rozdělení mandátů nad agregovanými daty')
+    args = parser.parse_args()
+
+    agregovane = agreguj(args.soubory, podle_obci=bool(args.obce), sep=args.sep, encoding=args.encoding)
+    nazvy = nacti_ciselnik_stran(args.ciselnik, sep=args.sep, encoding=args.encoding) if args.ciselnik else None
+    data = agregovane.volebni_data(nazvy)
+    print(pd.DataFrame(data.hlasy, index=data.strany, columns=data.soubory)[['Celkem'] + KRAJE_NAZVY].to_string())
+    if args.okresy:
+        agregovane.tabulka_okresu(nazvy).to_csv(args.okresy, sep=';', encoding='utf-8-sig')
+    if args.obce:
+        agregovane.tabulka_obci(nazvy).to_csv(args.obce, sep=';', encoding='utf-8-sig')
+    if args.ulozit_csv:
+        for nazev in data.soubory:
+            df = data.tabulka(nazev); df['mandaty_procenta'] = 0.0
+            print(f'✔ Uloženo: {uloz_tabulku(nazev, df)}')
+    if args.analyza:
+        analyzuj_vysledky(data=data)
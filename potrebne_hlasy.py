@@ -0,0 +1,255 @@
+import numpy as np
+from typing import NamedTuple
+
+from alokace import POCET_MANDATU, VysledekAlokace, alokuj
+
+
+# --- POMOCNÉ FUNKCE ---
+
+# Mandáty strany v kraji jsou po částech konstantní funkcí změny jejích hlasů d, ale ne monotónní: zaokrouhlení
+# RMČ, KVČ a RVČ a pořadí zbytků je mohou posunout tam i zpět. Výsledek se může změnit jen tam, kde se změní
+# některé z celých čísel výpočtu (podíl zaokrouhlený dolů nebo na celé číslo) nebo pořadí zbytků, takže se
+# stačí posouvat po těchto bodech zlomu a v každém ověřit alokací.
+
+NEKONECNO = np.iinfo(np.int64).max // 4
+MAX_PRIRUSTKU = 4  # kolik nejbližších přírůstků mandátů ostatních stran se sleduje pro vznik přebytku
+
+def _krok_podilu(hodnota, delitel, smer):
+    """Vzdálenost (ve směru smer) k nejbližší změně hodnota // delitel; delitel <= 0 se nemění."""
+    d = np.maximum(delitel, 1)
+    krok = np.where(smer > 0, d - hodnota % d, hodnota % d + 1)
+    return np.where(delitel > 0, krok, NEKONECNO)
+
+def _krok_zaokrouhleni(hodnota, delitel, podil, smer):
+    """
+    Vzdálenost k nejbližší změně zaokrouhlení hodnota / delitel (aktuálně `podil`) na celé číslo,
+    s polovinou zaokrouhlenou k sudému jako v alokace._zaokrouhli.
+    """
+    hranice = np.where(smer > 0, (2 * podil + 1) * delitel, (2 * podil - 1) * delitel)   # dvojnásobek poloviny
+    krok = np.where(smer > 0, (hranice + 1) // 2 - hodnota, hodnota - hranice // 2)
+    # přesně na polovině se hodnota změní jen tehdy, když se zaokrouhlí k sousednímu (sudému) číslu
+    na_polovine = (hranice % 2 == 0) & ((podil + smer) % 2 != 0)
+    return np.where(delitel > 0, np.maximum(krok + na_polovine, 1), NEKONECNO)
+
+def _krok_poradi(hodnota, ostatni, maska, smer):
+    """Vzdálenost, za kterou hodnota (mění se o 1 na hlas) dosáhne nebo přeskočí některou z hodnot `ostatni`."""
+    dosah = smer[:, None] * (ostatni - hodnota[:, None])
+    krok = np.where(dosah > 0, dosah, np.where(dosah == 0, 1, NEKONECNO))
+    return np.where(maska, krok, NEKONECNO).min(axis=1)
+
+class _Stav(NamedTuple):
+    """Veličiny dávky variant (B,), ze kterých se počítají body zlomu; viz _stav."""
+    v: VysledekAlokace      # alokace dávky (B, S, K)
+    hlasy_kraje: np.ndarray  # (B, K) celkové hlasy krajů
+    b: np.ndarray           # (B,) 0..B-1
+    strany: np.ndarray      # (B,) měněná strana
+    kraje: np.ndarray       # (B,) měněný kraj
+    smer: np.ndarray        # (B,) +1 zisk, -1 ztráta
+    zaklad: np.ndarray      # (B,) výchozí mandáty strany v kraji
+    pocet_mandatu: int
+    hlasy_v_kraji: np.ndarray  # (B, S) hlasy úspěšných stran v měněném kraji
+    kvc: np.ndarray         # (B,) KVČ měněného kraje
+    delitel_kvc: np.ndarray  # (B,) mandáty měněného kraje + 2
+    mandaty_pred: np.ndarray  # (B, S) mandáty 1. skrutinia v kraji před odečtením přebytku
+    zbytky_pred: np.ndarray  # (B, S) zbytky v kraji před odečtením přebytku
+    prebytek: np.ndarray    # (B,) kraj má v 1. skrutiniu přebytek mandátů
+    jine_strany: np.ndarray  # (B, S)
+    jine_kraje: np.ndarray  # (B, K)
+    nerozdeleno: np.ndarray  # (B,) mandáty pro 2. skrutinium
+
+def _stav(v, hlasy, hlasy_kraje, strany, kraje, smer, zaklad, pocet_mandatu):
+    """Sestaví _Stav z dávkové alokace v a jejích vstupů (parametry jako u _krok)."""
+    b = np.arange(len(strany))
+    kvc = v.kvc[b, kraje]
+    hlasy_v_kraji = hlasy[b, :, kraje]
+    mandaty_pred = np.where(kvc[:, None] > 0, hlasy_v_kraji // np.maximum(kvc, 1)[:, None], 0)
+    return _Stav(v, hlasy_kraje, b, strany, kraje, smer, zaklad, pocet_mandatu, hlasy_v_kraji, kvc,
+                 v.mandaty_kraju[b, kraje] + 2, mandaty_pred, hlasy_v_kraji - mandaty_pred * kvc[:, None],
+                 mandaty_pred.sum(axis=-1) > v.mandaty_kraju[b, kraje],
+                 np.arange(hlasy.shape[-2]) != strany[:, None], np.arange(hlasy.shape[-1]) != kraje[:, None],
+                 pocet_mandatu - v.mandaty_f1.sum(axis=(-2, -1)))
+
+# Body zlomu: vzdálenost (B,) k nejbližší změně jedné celočíselné veličiny nebo pořadí alokace.
+
+def _zlom_rmc(st):
+    """RMČ (celkové hlasy / počet mandátů zaokrouhlené)."""
+    return _krok_zaokrouhleni(st.hlasy_kraje.sum(axis=-1), np.full(len(st.b), st.pocet_mandatu), st.v.rmc, st.smer)
+
+def _zlom_mandatu_kraje(st):
+    """Mandáty měněného kraje dělením RMČ."""
+    return _krok_podilu(st.hlasy_kraje[st.b, st.kraje], st.v.rmc, st.smer)
+
+def _zlom_zbytku_kraju(st):
+    """Pořadí zbytků krajů po dělení RMČ (největší zbytky dostanou mandát)."""
+    zbytky = st.hlasy_kraje % np.maximum(st.v.rmc, 1)[:, None]
+    return _krok_poradi(zbytky[st.b, st.kraje], zbytky, st.jine_kraje & (st.v.rmc > 0)[:, None], st.smer)
+
+def _zlom_kvc(st):
+    """KVČ měněného kraje."""
+    return _krok_zaokrouhleni(st.hlasy_v_kraji.sum(axis=-1), st.delitel_kvc, st.kvc, st.smer)
+
+def _zlom_mandatu_strany(st):
+    """Mandáty strany v kraji dělením KVČ (před odečtením přebytku)."""
+    return _krok_podilu(st.hlasy_v_kraji[st.b, st.strany], st.kvc, st.smer)
+
+def _zlom_prebytku(st):
+    """Pořadí zbytků stran v kraji, které při přebytku rozhoduje, komu se mandát odečte."""
+    krok = _krok_poradi(st.zbytky_pred[st.b, st.strany], st.zbytky_pred, st.jine_strany & (st.mandaty_pred > 0), st.smer)
+    return np.where(st.prebytek, krok, NEKONECNO)
+
+def _zlom_umisteni(st):
+    """Pořadí zbytků strany po krajích, podle kterého se umísťují mandáty 2. skrutinia."""
+    zbytky = st.v.zbytky_f1[st.b, st.strany]
+    return _krok_poradi(zbytky[st.b, st.kraje], zbytky, st.jine_kraje, st.smer)
+
+def _zlom_rvc(st):
+    """RVČ (součet zbytků / (nerozdělené mandáty + 1) zaokrouhlené)."""
+    delitel = np.where(st.nerozdeleno > 0, st.nerozdeleno + 1, 0)
+    return _krok_zaokrouhleni(st.v.zbytky_f1.sum(axis=(-2, -1)), delitel, st.v.rvc, st.smer)
+
+def _zlom_delenim_rvc(st):
+    """Mandáty strany v 2. skrutiniu dělením RVČ."""
+    return _krok_podilu(st.v.zbytky_f1[st.b, st.strany].sum(axis=-1), st.v.rvc, st.smer)
+
+def _zlom_zbytku_f2(st):
+    """Pořadí zbytků stran po dělení RVČ (největší zbytky dostanou mandát)."""
+    zbytky = st.v.zbytky_f2
+    return _krok_poradi(zbytky[st.b, st.strany], zbytky, st.jine_strany, st.smer)
+
+ZLOMY_KRAJU = (_zlom_rmc, _zlom_mandatu_kraje, _zlom_zbytku_kraju)
+ZLOMY = ZLOMY_KRAJU + (_zlom_kvc, _zlom_mandatu_strany, _zlom_prebytku, _zlom_umisteni, _zlom_rvc, _zlom_delenim_rvc, _zlom_zbytku_f2)
+
+# Delší skoky: úseky, na kterých se mandáty strany v kraji prokazatelně nezmění, přestože se mění KVČ a RVČ.
+
+def _kvc_nula(st):
+    """Vzdálenost, za kterou KVČ klesne na nulu (jen ztráta)."""
+    return np.where(st.smer > 0, NEKONECNO, np.maximum(st.hlasy_v_kraji.sum(axis=-1) - st.delitel_kvc // 2, 1))
+
+def _zmeny_ostatnich(st, poradi=1):
+    """
+    Vzdálenosti (B, S, poradi), za které KVČ klesne nebo vzroste tak, že se mandáty ostatních stran v kraji změní
+    po j-té (j = 1..poradi): při zisku KVČ roste a mandát ubude při KVČ = hlasy // mandáty + 1, při ztrátě KVČ
+    klesá a mandát přibude při KVČ = hlasy // (mandáty + j). Vlastní strana a nemožné změny mají NEKONECNO.
+    """
+    hlasy, mandaty = st.hlasy_v_kraji[..., None], st.mandaty_pred[..., None]
+    soucet, delitel = st.hlasy_v_kraji.sum(axis=-1)[:, None, None], st.delitel_kvc[:, None, None]
+    j = np.arange(1, poradi + 1)
+    zisk = ((2 * (hlasy // np.maximum(mandaty, 1) + 1) - 1) * delitel + 1) // 2 - soucet
+    ztrata = soucet - (2 * (hlasy // (mandaty + j)) + 1) * delitel // 2
+    mozne = st.jine_strany[..., None] & ((st.smer[:, None, None] < 0) | (mandaty > 0))
+    return np.where(mozne, np.where(st.smer[:, None, None] > 0, zisk, ztrata), NEKONECNO)
+
+def _skok_prvni_skrutinium(st, meze, zmeny_ostatnich):
+    """
+    Dokud se nezmění mandáty krajů, KVČ kraje se s hlasy strany mění jen stejným směrem, takže mandáty strany
+    z 1. skrutinia nepřekročí hodnotu danou současným KVČ (odečtení přebytku je jen ubírá). Nemůže-li tedy strana
+    ani s mandátem z 2. skrutinia navíc (zisk), resp. bez něj (ztráta), překročit `zaklad`, stačí skočit na bod
+    zlomu krajů nebo mandátů strany. Při ztrátě skok navíc končí tam, kde by mandáty ostatních stran vzrostly
+    tolikrát, že by v kraji vznikl přebytek. meze: nejbližší bod zlomu krajů, mandátů strany nebo nulového KVČ,
+    zmeny_ostatnich: _zmeny_ostatnich(st, MAX_PRIRUSTKU). Vrací (použitelné, skok).
+    """
+    mandaty = st.mandaty_pred[st.b, st.strany]
+    volne = np.clip(st.v.mandaty_kraju[st.b, st.kraje] - st.mandaty_pred.sum(axis=-1) + 1, 1, MAX_PRIRUSTKU)
+    vznik_prebytku = np.sort(zmeny_ostatnich.reshape(len(st.b), -1), axis=-1)[st.b, volne - 1]
+    skok = np.minimum(meze, np.where(st.smer > 0, NEKONECNO, vznik_prebytku))
+    pouzitelne = (st.kvc > 0) & np.where(st.smer > 0, mandaty + 1 <= st.zaklad, (mandaty >= st.zaklad) & ~st.prebytek)
+    return pouzitelne, np.maximum(skok, 1)
+
+def _skok_umisteni(st, meze, zmeny_ostatnich):
+    """
+    Změna jen o mandát z 2. skrutinia (zisk bez něj, ztráta s ním): dokud se nezmění mandáty krajů, mandáty strany
+    z 1. skrutinia a mandáty ostatních stran v kraji, mění se zbytek strany v kraji i její zbytky celkem nejvýš
+    o hlas na hlas a součet zbytků se proti směru změny posune nejvýš o mandáty kraje z 1. skrutinia. Strana tak má
+    nejvýš (zisk), resp. nejméně (ztráta) `pocet` mandátů 2. skrutinia a mandát v kraji získá nebo ztratí, až její
+    zbytek dosáhne pocet-tého největšího zbytku ve zbylých krajích. Parametry jako u _skok_prvni_skrutinium.
+    Vrací (použitelné, skok).
+    """
+    K = st.jine_kraje.shape[-1]
+    meze = np.maximum(np.minimum(meze, zmeny_ostatnich[..., 0].min(axis=-1)), 1)
+    zbytky_strany, zbytky_celkem = st.v.zbytky_f1[st.b, st.strany], st.v.zbytky_f1.sum(axis=-1)
+    rvc_meze = np.rint((zbytky_celkem.sum(axis=-1) - st.smer * st.mandaty_pred.sum(axis=-1))
+                       / (np.maximum(st.nerozdeleno, 0) + 1)).astype(np.int64)
+    zbytky_meze = np.maximum(zbytky_celkem[st.b, st.strany] + st.smer * meze, 0)
+    pocet = zbytky_meze // np.maximum(rvc_meze, 1) + (st.smer > 0)
+    ostatni = -np.sort(-np.where(st.jine_kraje, zbytky_strany, -1), axis=-1)[:, :K - 1]
+    hranice = np.where((pocet >= 1) & (pocet < K), ostatni[st.b, np.clip(pocet, 1, K - 1) - 1], -1)
+    dosah = st.smer * (hranice - zbytky_strany[st.b, st.kraje])
+    mandaty = st.mandaty_pred[st.b, st.strany]
+    pouzitelne = ((st.kvc > 0) & ~st.prebytek & (st.nerozdeleno > 0) & (rvc_meze > 0) & (pocet >= 1) & (dosah > 0)
+                  & (mandaty == np.where(st.smer > 0, st.zaklad, st.zaklad - 1)))
+    return pouzitelne, np.minimum(meze, dosah)
+
+def _krok(v, hlasy, hlasy_kraje, strany, kraje, smer, zaklad, pocet_mandatu):
+    """
+    Vzdálenost k dalšímu bodu, ve kterém se mandáty strany v kraji mohou změnit, pro každou variantu dávky:
+    nejbližší bod zlomu (ZLOMY), případně delší skok (_skok_prvni_skrutinium, _skok_umisteni).
+    v: VysledekAlokace dávky (B, S, K), hlasy a hlasy_kraje jsou její vstupy, strany a kraje (B,) měněné dvojice.
+    """
+    st = _stav(v, hlasy, hlasy_kraje, strany, kraje, smer, zaklad, pocet_mandatu)
+    zlomy = {zlom: zlom(st) for zlom in ZLOMY}
+    krok = np.minimum.reduce(list(zlomy.values()))
+    meze = np.minimum.reduce([zlomy[zlom] for zlom in ZLOMY_KRAJU + (_zlom_mandatu_strany,)] + [_kvc_nula(st)])
+    zmeny_ostatnich = _zmeny_ostatnich(st, MAX_PRIRUSTKU)
+    pouzitelne, skok = _skok_prvni_skrutinium(st, meze, zmeny_ostatnich)
+    krok = np.where(pouzitelne, skok, krok)
+    pouzitelne, skok = _skok_umisteni(st, meze, zmeny_ostatnich)
+    return np.where(pouzitelne, np.maximum(krok, skok), krok)
+
+def _hledej(hlasy, hlasy_kraje, strany, kraje, smer, zaklad, strop, pocet_mandatu):
+    """
+    Pro každou dvojici strana, kraj najde nejmenší změnu hlasů ve směru smer (+1 zisk, -1 ztráta; nejvýše
+    `strop`), po které se mandáty strany v kraji změní oproti `zaklad`. Všechny dvojice se posouvají po bodech
+    zlomu (_krok) společně, jednou dávkovou alokací za krok. hlasy jsou jen úspěšné strany, hlasy_kraje
+    celkové hlasy krajů. Vrací float, NaN = nenalezeno.
+    """
+    zmena = np.zeros(len(strany), dtype=np.int64)
+    vysledek = np.full(len(strany), np.nan)
+    aktivni = np.arange(len(strany))
+    while len(aktivni):
+        s, k, z = strany[aktivni], kraje[aktivni], smer[aktivni] * zmena[aktivni]
+        varianty = np.broadcast_to(hlasy, (len(aktivni),) + hlasy.shape).copy()
+        varianty[np.arange(len(aktivni)), s, k] += z
+        kraje_var = np.broadcast_to(hlasy_kraje, (len(aktivni), len(hlasy_kraje))).copy()
+        kraje_var[np.arange(len(aktivni)), k] += z
+        v = alokuj(varianty, hlasy_kraje=kraje_var, pocet_mandatu=pocet_mandatu)
+        m = v.mandaty[np.arange(len(aktivni)), s, k]
+        zmeneno = (zmena[aktivni] > 0) & np.where(smer[aktivni] > 0, m > zaklad[aktivni], m < zaklad[aktivni])
+        vysledek[aktivni[zmeneno]] = zmena[aktivni[zmeneno]]
+        krok = _krok(v, varianty, kraje_var, s, k, smer[aktivni], zaklad[aktivni], pocet_mandatu)
+        zmena[aktivni] += krok
+        aktivni = aktivni[~zmeneno & (zmena[aktivni] <= strop[aktivni])]
+    return vysledek
+
+# --- VÝPOČETNÍ FUNKCE ---
+
+def hlasy_k_mandatu(hlasy, uspesne, pocet_mandatu=POCET_MANDATU):
+    """
+    Pro každou úspěšnou stranu a kraj spočítá minimální počet hlasů, které by strana v kraji musela
+    získat navíc pro zisk dalšího mandátu, a minimální počet hlasů, jejichž ztráta by ji stála mandát.
+
+    hlasy: int64 (S, K) hlasy všech stran, uspesne: bool (S,). Množina úspěšných stran se při změně
+    hlasů nemění. Mandáty nejsou v hlasech monotónní (zaokrouhlení KVČ, RVČ a RMČ), proto se nehledá
+    půlením: změna hlasů se posouvá od nuly po bodech zlomu z KVČ, RVČ, RMČ a pořadí zbytků (_krok)
+    a v každém se mandáty ověří dávkovou alokací, takže nalezená hodnota je skutečně nejmenší.
+    Neúspěšné strany vstupují jen do celkových hlasů krajů. Vrací (zisk, ztrata) jako float (S, K),
+    NaN tam, kde změna není možná.
+    """
+    hlasy = np.asarray(hlasy, dtype=np.int64); uspesne = np.asarray(uspesne, dtype=bool)
+    S, K = hlasy.shape
+    zaklad = alokuj(hlasy, uspesne, pocet_mandatu=pocet_mandatu)
+
+    strany, kraje = np.nonzero(np.broadcast_to(uspesne[:, None], (S, K)))
+    radky = np.flatnonzero(uspesne)
+    hlasy_uspesnych, hlasy_kraje = hlasy[uspesne], hlasy.sum(axis=0)
+    mandaty = zaklad.mandaty[strany, kraje]
+    poradi = np.searchsorted(radky, strany)
+    zisk = np.full((S, K), np.nan); ztrata = np.full((S, K), np.nan)
+
+    maji = mandaty > 0   # ztrátu má smysl hledat jen tam, kde strana mandát má; nejvýš o všechny své hlasy
+    P, Z = len(strany), int(maji.sum())
+    nalezeno = _hledej(hlasy_uspesnych, hlasy_kraje, np.concatenate([poradi, poradi[maji]]), np.concatenate([kraje, kraje[maji]]),
+                       np.repeat([1, -1], [P, Z]), np.concatenate([mandaty, mandaty[maji]]),
+                       np.concatenate([np.full(P, max(int(hlasy.sum()), 1)), hlasy[strany[maji], kraje[maji]]]), pocet_mandatu)
+    zisk[strany, kraje] = nalezeno[:P]
+    ztrata[strany[maji], kraje[maji]] = nalezeno[P:]
+    return zisk, ztrata
@@ -1,14 +1,19 @@
 import os
-import time
+import re
+import argparse
+import threading
 import pandas as pd
 import numpy as np
-from io import StringIO
+import requests
+import lxml.html
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 
 # Cílová složka pro uložení finálních CSV souborů
 TARGET_DIR = '.' 
@@ -16,6 +21,12 @@ TARGET_DIR = '.'
 # Základní URL pro výsledky voleb 2025
 BASE_URL = 'https://www.volby.cz/app/ps2025/cs/results'
 
+# Počet souběžně stahovaných krajů a časový limit pro načtení jedné stránky (s)
+SOUBEZNOST = 4
+TIMEOUT = 15
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
 # Slovník krajů s jejich kódy a názvy pro soubory
 KRAJE = {
     'Celkem': '',
@@ -37,87 +48,276 @@ KRAJE = {
 }
 
 
-def scrape_clean_and_save(nazev, kod):
-    """
-    Načte stránku, inteligentně zpracuje data podle struktury (kraj vs. zahraničí)
-    a uloží finální čisté CSV.
-    """
-    if kod:
-        url = f'{BASE_URL}/!___{kod}'
-    else:
-        url = BASE_URL
-    
-    nazev_souboru = f'vysledky_ps2025_{nazev}.csv'
-    cesta_k_souboru = os.path.join(TARGET_DIR, nazev_souboru)
+# --- STAHOVÁNÍ ---
 
-    print(f"Zpracovávám: {nazev}...")
+@lru_cache(maxsize=None)
+def _cesta_k_driveru():
+    """ChromeDriverManager().install() se volá jen jednou za běh."""
+    return ChromeDriverManager().install()
 
+def vytvor_driver():
+    """Spustí jeden headless Chrome."""
     options = webdriver.ChromeOptions()
     options.add_argument('--headless')
     options.add_argument('--disable-gpu')
-    options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
+    options.add_argument(f'user-agent={USER_AGENT}')
+    return webdriver.Chrome(service=ChromeService(_cesta_k_driveru()), options=options)
+
+def vytvor_http_session(soubeznost=SOUBEZNOST):
+    """HTTP klient se sdíleným poolem spojení pro všechny kraje."""
+    session = requests.Session()
+    session.headers['User-Agent'] = USER_AGENT
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=soubeznost)
+    session.mount('http://', adapter); session.mount('https://', adapter)
+    return session
 
-    driver = webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()), options=options)
+def url_kraje(kod, base_url=BASE_URL):
+    return f'{base_url}/!___{kod}' if kod else base_url
 
+def _tabulka_vykreslena(driver):
+    """Podmínka připravenosti: výsledková (druhá) tabulka na stránce už má řádky."""
+    tabulky = driver.find_elements(By.TAG_NAME, 'table')
+    return len(tabulky) > 1 and len(tabulky[1].find_elements(By.CSS_SELECTOR, 'tbody tr')) > 0
+
+def stahni_selenium(driver, url):
+    """Načte stránku v již běžícím prohlížeči a počká, až je výsledková tabulka vykreslená."""
+    driver.get(url)
+    WebDriverWait(driver, TIMEOUT).until(_tabulka_vykreslena)
+    return driver.page_source
+
+_META_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.IGNORECASE)
+
+def kodovani_odpovedi(odpoved):
+    """
+    Kódování stránky: z hlavičky Content-Type, jinak z <meta charset> dokumentu, jinak UTF-8, pokud jím obsah
+    jde dekódovat, jinak odhad requests. (Bez charsetu v hlavičce requests dosadí ISO-8859-1 a rozbije češtinu.)
+    """
+    if 'charset=' in odpoved.headers.get('Content-Type', '').lower():
+        return odpoved.encoding
+    nalez = _META_CHARSET.search(odpoved.content[:4096])
+    if nalez:
+        return nalez.group(1).decode('ascii')
     try:
-        driver.get(url)
-        WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.CSS_SELECTOR, "tbody tr")))
-        time.sleep(1) 
+        odpoved.content.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return odpoved.apparent_encoding or 'utf-8'
 
-        html_source = driver.page_source
-        
-        df_raw = pd.read_html(
-            StringIO(html_source), 
-            decimal=',',
-            thousands='\xa0'
-        )[1]
-
-        # --- KLÍČOVÁ ZMĚNA: Ošetření pro zahraničí ---
-        is_zahranici = (nazev == 'Zahranici')
-
-        if is_zahranici:
-            # Zahraničí má méně sloupců (chybí mandáty)
-            df = pd.DataFrame({
-                'nazev_strany': df_raw.iloc[:, 1],
-                'hlasy_celkem': df_raw.iloc[:, 2],
-                'hlasy_procenta': df_raw.iloc[:, 3],
-            })
-            # Doplníme chybějící sloupce nulami pro konzistentní strukturu
-            df['mandaty_pocet'] = 0
-            df['mandaty_procenta'] = 0.0
-        else:
-            # Standardní zpracování pro kraje
-            if df_raw.shape[1] < 6:
-                raise ValueError("Tabulka pro kraj nemá očekávaný počet sloupců.")
-            df = pd.DataFrame({
-                'nazev_strany': df_raw.iloc[:, 1],
-                'hlasy_celkem': df_raw.iloc[:, 2],
-                'hlasy_procenta': df_raw.iloc[:, 3],
-                'mandaty_pocet': df_raw.iloc[:, 4],
-                'mandaty_procenta': df_raw.iloc[:, 5]
-            })
-        
-        # Finální úpravy datových typů
-        df = df.dropna(subset=['hlasy_celkem'])
-        df['hlasy_celkem'] = df['hlasy_celkem'].astype(np.int64)
-        df['mandaty_pocet'] = df['mandaty_pocet'].fillna(0).astype(int)
+def stahni_http(session, url):
+    """
+    Stáhne stránku bez prohlížeče. Pokud server vrací stránku bez vykreslené výsledkové tabulky
+    (vyžaduje JavaScript), vyhodí ValueError.
+    """
+    odpoved = session.get(url, timeout=TIMEOUT)
+    odpoved.raise_for_status()
+    odpoved.encoding = kodovani_odpovedi(odpoved)
+    if odpoved.text.lower().count('<table') < 2:
+        raise ValueError(f"Stránka {url} neobsahuje výsledkovou tabulku (vyžaduje JavaScript?).")
+    return odpoved.text
+
+# --- ZPRACOVÁNÍ ---
+
+_HTML_PARSER = lxml.html.HTMLParser(encoding='utf-8')
+
+def _cislo(text, typ=int):
+    """Převede text buňky ('1\xa0234', '34,51') na číslo; prázdná nebo nečíselná buňka je NaN."""
+    text = text.replace('\xa0', '').replace('\u202f', '').replace(' ', '').replace(',', '.')
+    try:
+        return typ(text)
+    except ValueError:
+        return np.nan
+
+def _ciselny_sloupec(texty):
+    """
+    Převede sloupec buněk na čísla s typem odvozeným jako dřív v pd.read_html: celá čísla, pokud jsou všechny
+    buňky celočíselné, jinak float (např. mandaty_procenta kraje '1' zůstane 1, ne 1.0).
+    """
+    cisla = [_cislo(t, int) for t in texty]
+    if any(isinstance(c, float) for c in cisla):
+        cisla = [_cislo(t, float) for t in texty]
+    return cisla
+
+def najdi_tabulku(html_source, poradi=1):
+    """
+    Vrátí řádky `poradi`-té tabulky na stránce (výchozí druhá = výsledková) jako seznamy textů buněk.
+    Parsuje se jen HTML stránky přes lxml, ostatní tabulky se nepřevádějí. Hlavička (thead) se vynechá.
+    """
+    if isinstance(html_source, str):
+        html_source = html_source.encode('utf-8')
+    tabulka = lxml.html.fromstring(html_source, parser=_HTML_PARSER).xpath('//table')[poradi]
+    radky = tabulka.xpath('./tbody/tr') or tabulka.xpath('./tr[td]')
+    return [[bunka.text_content().strip() for bunka in radek.xpath('./td|./th')] for radek in radky]
+
+def zpracuj_tabulku(nazev, html_source):
+    """
+    Inteligentně zpracuje data podle struktury (kraj vs. zahraničí) a vrátí čistou tabulku.
+    """
+    radky = najdi_tabulku(html_source)
+    sirka = max((len(r) for r in radky), default=0)
+    df_raw = pd.DataFrame([r + [''] * (sirka - len(r)) for r in radky])
+    for sloupec in range(2, min(sirka, 6)):
+        df_raw[sloupec] = _ciselny_sloupec(df_raw[sloupec])
+
+    # --- KLÍČOVÁ ZMĚNA: Ošetření pro zahraničí ---
+    is_zahranici = (nazev == 'Zahranici')
+
+    if is_zahranici:
+        # Zahraničí má méně sloupců (chybí mandáty)
+        df = pd.DataFrame({
+            'nazev_strany': df_raw.iloc[:, 1],
+            'hlasy_celkem': df_raw.iloc[:, 2],
+            'hlasy_procenta': df_raw.iloc[:, 3],
+        })
+        # Doplníme chybějící sloupce nulami pro konzistentní strukturu
+        df['mandaty_pocet'] = 0
+        df['mandaty_procenta'] = 0.0
+    else:
+        # Standardní zpracování pro kraje
+        if df_raw.shape[1] < 6:
+            raise ValueError("Tabulka pro kraj nemá očekávaný počet sloupců.")
+        df = pd.DataFrame({
+            'nazev_strany': df_raw.iloc[:, 1],
+            'hlasy_celkem': df_raw.iloc[:, 2],
+            'hlasy_procenta': df_raw.iloc[:, 3],
+            'mandaty_pocet': df_raw.iloc[:, 4],
+            'mandaty_procenta': df_raw.iloc[:, 5]
+        })
+
+    # Finální úpravy datových typů
+    df = df.dropna(subset=['hlasy_celkem'])
+    df['hlasy_celkem'] = df['hlasy_celkem'].astype(np.int64)
+    df['mandaty_pocet'] = df['mandaty_pocet'].fillna(0).astype(int)
+
+    return df
+
+def uloz_tabulku(nazev, df, adresar=None):
+    """Uloží čistou tabulku jako CSV v adresáři (výchozí TARGET_DIR) a vrátí cestu k souboru."""
+    cesta_k_souboru = os.path.join(adresar or TARGET_DIR, f'vysledky_ps2025_{nazev}.csv')
+    df.to_csv(cesta_k_souboru, index=False, encoding='utf-8-sig', sep=';', decimal='.')
+    return cesta_k_souboru
 
-        df.to_csv(cesta_k_souboru, index=False, encoding='utf-8-sig', sep=';', decimal='.')
+def zpracuj_a_uloz(nazev, html_source):
+    """
+    Zpracuje stránku a uloží finální čisté CSV.
+    """
+    try:
+        cesta_k_souboru = uloz_tabulku(nazev, zpracuj_tabulku(nazev, html_source))
         print(f'✔ Hotovo. Data pro {nazev} uložena do: {cesta_k_souboru}')
 
     except IndexError:
         print(f"❌ Chyba: Pro {nazev} se nepodařilo najít očekávanou tabulku výsledků na stránce.")
     except Exception as e:
         print(f'❌ Nastala neočekávaná chyba pro {nazev}: {e}')
+
+
+def scrape_clean_and_save(nazev, kod, driver=None, archiv=None):
+    """
+    Načte stránku jednoho kraje a uloží finální čisté CSV. Bez předaného driveru spustí vlastní prohlížeč.
+    S archivem (archiv.ArchivStranek) se surová stránka uloží i do archivu.
+    """
+    print(f"Zpracovávám: {nazev}...")
+    vlastni_driver = driver is None
+    driver = vytvor_driver() if vlastni_driver else driver
+    try:
+        html_source = stahni_selenium(driver, url_kraje(kod))
+        if archiv is not None:
+            archiv.uloz(nazev, html_source)
+        zpracuj_a_uloz(nazev, html_source)
+    except Exception as e:
+        print(f'❌ Nastala neočekávaná chyba pro {nazev}: {e}')
     finally:
-        driver.quit()
+        if vlastni_driver:
+            driver.quit()
+
+
+class Stahovac:
+    """
+    Drží prohlížeče nebo HTTP klienta a vlákna pro opakovaná stahování (např. v režimu sledování).
+
+    rezim: 'selenium' - každé vlákno používá jeden prohlížeč pro všechny své kraje,
+           'http'     - sdílený HTTP klient bez prohlížeče (stránka musí jít vykreslit bez JavaScriptu),
+           'auto'     - nejdřív HTTP, při neúspěchu prohlížeč.
+    base_url lze nasměrovat na lokální server s uloženými stránkami (např. http://127.0.0.1:8000/results
+    obsluhující /results a /results/!___1100 ..., viz testovaci_server.py). S archivem (archiv.ArchivStranek) se každá stažená
+    stránka uloží do archivu.
+    """
+
+    def __init__(self, rezim='selenium', soubeznost=SOUBEZNOST, base_url=BASE_URL, archiv=None):
+        self.rezim, self.base_url, self.archiv = rezim, base_url, archiv
+        self.session = vytvor_http_session(soubeznost) if rezim in ('http', 'auto') else None
+        self.executor = ThreadPoolExecutor(max_workers=soubeznost)
+        self._lokalni = threading.local()
+        self._drivery, self._zamek = [], threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.zavri()
+
+    def _driver_vlakna(self):
+        if not hasattr(self._lokalni, 'driver'):
+            self._lokalni.driver = vytvor_driver()
+            with self._zamek:
+                self._drivery.append(self._lokalni.driver)
+        return self._lokalni.driver
+
+    def stahni(self, kod):
+        """Stáhne HTML stránky jednoho kraje."""
+        url = url_kraje(kod, self.base_url)
+        if self.rezim == 'selenium':
+            return stahni_selenium(self._driver_vlakna(), url)
+        try:
+            return stahni_http(self.session, url)
+        except (requests.RequestException, ValueError):
+            if self.rezim == 'http':
+                raise
+            return stahni_selenium(self._driver_vlakna(), url)
+
+    def stahni_vse(self, kraje=KRAJE):
+        """Stáhne všechny kraje souběžně; průběžně vrací dvojice (nazev, html nebo výjimka) v pořadí dokončení."""
+        ulohy = {self.executor.submit(self.stahni, kod): nazev for nazev, kod in kraje.items()}
+        for uloha in as_completed(ulohy):
+            vysledek = uloha.exception() or uloha.result()
+            if self.archiv is not None and not isinstance(vysledek, Exception):
+                self.archiv.uloz(ulohy[uloha], vysledek)
+            yield ulohy[uloha], vysledek
+
+    def zavri(self):
+        self.executor.shutdown()
+        for driver in self._drivery:
+            driver.quit()
+        if self.session is not None:
+            self.session.close()
+
+
+def stahni_vse(kraje=KRAJE, rezim='selenium', soubeznost=SOUBEZNOST, base_url=BASE_URL, archiv=None):
+    """
+    Stáhne a uloží všechny kraje souběžně (nejvýše `soubeznost` najednou), viz Stahovac.
+    """
+    with Stahovac(rezim, soubeznost, base_url, archiv) as stahovac:
+        for nazev, html in stahovac.stahni_vse(kraje):
+            print(f"Zpracovávám: {nazev}...")
+            if isinstance(html, Exception):
+                print(f'❌ Nastala neočekávaná chyba pro {nazev}: {html}')
+            else:
+                zpracuj_a_uloz(nazev, html)
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Stažení výsledků voleb 2025 po krajích.')
+    parser.add_argument('--rezim', choices=['selenium', 'http', 'auto'], default='selenium')
+    parser.add_argument('--soubeznost', type=int, default=SOUBEZNOST)
+    parser.add_argument('--base-url', default=BASE_URL)
+    parser.add_argument('--archiv', help='adresář archivu, do kterého se uloží i surové stránky')
+    args = parser.parse_args()
+
     print("--- Zahajuji stahování a čištění kompletních výsledků voleb 2025 ---")
     os.makedirs(TARGET_DIR, exist_ok=True)
     
-    for nazev_kraje, kod_kraje in KRAJE.items():
-        scrape_clean_and_save(nazev_kraje, kod_kraje)
+    if args.archiv:
+        from archiv import ArchivStranek
+    stahni_vse(rezim=args.rezim, soubeznost=args.soubeznost, base_url=args.base_url,
+               archiv=ArchivStranek(args.archiv) if args.archiv else None)
         
-    print("\n--- Všechny operace dokončeny. ---")
\ No newline at end of file
+    print("\n--- Všechny operace dokončeny. ---")
@@ -0,0 +1,124 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from alokace import POCET_MANDATU, alokuj, procenta_hlasu
+from analyza import KRAJE_NAZVY, MAPOVANI_NAZVU_STRAN, VOLEBNI_KLAUZULE, nacti_matici_hlasu
+
+# --- KONFIGURACE ---
+VELIKOST_ULOHY = 20_000   # počet simulací zpracovaných jedním procesem najednou
+VELIKOST_DAVKY = 2_000    # počet matic alokovaných jedním voláním alokuj()
+KONCENTRACE = 2_000.0     # parametr Dirichletova šumu (vyšší = menší rozptyl)
+
+
+class VysledekSimulace(NamedTuple):
+    """Histogramy výsledků simulace. Poslední osa je vždy počet mandátů 0..POCET_MANDATU."""
+    strany: list
+    kraje: list
+    pocet: int
+    mandaty_stran: np.ndarray        # (S, M+1) rozdělení celkového počtu mandátů strany
+    mandaty_stran_kraje: np.ndarray  # (S, K, M+1) rozdělení mandátů strany v kraji
+    mandaty_kraju: np.ndarray        # (K, M+1) rozdělení počtu mandátů kraje
+    presla_klauzuli: np.ndarray      # (S,) kolikrát strana překročila klauzuli
+
+
+# --- POMOCNÉ FUNKCE ---
+
+def _zasumeni(rng, hlasy, pocet, sumeni, koncentrace):
+    """Vylosuje `pocet` zašuměných matic (pocet, S, K) se zachovaným počtem hlasů v každém kraji."""
+    hlasy_kraje = hlasy.sum(axis=0)
+    podily = (hlasy / np.maximum(hlasy_kraje, 1)).T                       # (K, S)
+    if sumeni == 'dirichlet':
+        g = rng.gamma(np.broadcast_to(podily * koncentrace, (pocet,) + podily.shape))
+        podily = g / np.maximum(g.sum(axis=-1, keepdims=True), np.finfo(float).tiny)
+    elif sumeni != 'multinomial':
+        raise ValueError(f"Neznámý typ šumu: {sumeni}")
+    vzorky = rng.multinomial(np.broadcast_to(hlasy_kraje, (pocet, len(hlasy_kraje))), podily)
+    return np.swapaxes(vzorky, -1, -2)
+
+def _simuluj_ulohu(hlasy, hlasy_mimo, pocet, seed, sumeni, koncentrace, klauzule, pocet_mandatu, velikost_davky):
+    """Spustí `pocet` simulací v jednom procesu a vrátí jejich histogramy."""
+    rng = np.random.default_rng(seed)
+    S, K = hlasy.shape; M = pocet_mandatu + 1
+    h_strany = np.zeros(S * M, dtype=np.int64)
+    h_strany_kraje = np.zeros(S * K * M, dtype=np.int64)
+    h_kraje = np.zeros(K * M, dtype=np.int64)
+    presla = np.zeros(S, dtype=np.int64)
+
+    for zacatek in range(0, pocet, velikost_davky):
+        b = min(velikost_davky, pocet - zacatek)
+        vzorky = _zasumeni(rng, hlasy, b, sumeni, koncentrace)
+        celostatne = vzorky.sum(axis=-1) + hlasy_mimo
+        uspesne = procenta_hlasu(celostatne) >= klauzule
+        vysledek = alokuj(vzorky, uspesne, pocet_mandatu=pocet_mandatu)
+
+        m = np.minimum(vysledek.mandaty, pocet_mandatu)
+        h_strany += np.bincount((np.arange(S) * M + m.sum(axis=-1).clip(max=pocet_mandatu)).ravel(), minlength=S * M)
+        h_strany_kraje += np.bincount(((np.arange(S)[:, None] * K + np.arange(K)) * M + m).ravel(), minlength=S * K * M)
+        h_kraje += np.bincount((np.arange(K) * M + vysledek.mandaty_kraju).ravel(), minlength=K * M)
+        presla += uspesne.sum(axis=0)
+
+    return h_strany.reshape(S, M), h_strany_kraje.reshape(S, K, M), h_kraje.reshape(K, M), presla
+
+# --- HLAVNÍ FUNKCE ---
+
+def simuluj(df_hlasy, pocet, seed=None, sumeni='dirichlet', koncentrace=KONCENTRACE, klauzule=VOLEBNI_KLAUZULE,
+            pocet_mandatu=POCET_MANDATU, procesy=None, velikost_ulohy=VELIKOST_ULOHY, velikost_davky=VELIKOST_DAVKY):
+    """
+    Monte Carlo simulace rozdělení mandátů nad zašuměnými výsledky.
+
+    df_hlasy: tabulka strany × kraje z nacti_matici_hlasu(). Sloupce KRAJE_NAZVY se šumí a alokují,
+    ostatní sloupce (Zahranici) se započítávají pouze do celostátní klauzule.
+    sumeni: 'multinomial' (výběrová chyba při zachování podílů) nebo 'dirichlet' (Dirichlet-multinomial,
+    rozptyl řízený parametrem koncentrace). Úlohy běží na všech jádrech a histogramy se průběžně sčítají,
+    takže paměť nezávisí na počtu simulací.
+    """
+    hlasy = df_hlasy[KRAJE_NAZVY].to_numpy(dtype=np.int64)
+    hlasy_mimo = df_hlasy.drop(columns=KRAJE_NAZVY).sum(axis=1).to_numpy(dtype=np.int64)
+    S, K = hlasy.shape; M = pocet_mandatu + 1
+
+    velikosti = [min(velikost_ulohy, pocet - z) for z in range(0, pocet, velikost_ulohy)]
+    seedy = np.random.SeedSequence(seed).spawn(len(velikosti))
+
+    h_strany = np.zeros((S, M), dtype=np.int64)
+    h_strany_kraje = np.zeros((S, K, M), dtype=np.int64)
+    h_kraje = np.zeros((K, M), dtype=np.int64)
+    presla = np.zeros(S, dtype=np.int64)
+    with ProcessPoolExecutor(max_workers=procesy or os.cpu_count()) as executor:
+        ulohy = [executor.submit(_simuluj_ulohu, hlasy, hlasy_mimo, n, sq, sumeni, koncentrace, klauzule, pocet_mandatu, velikost_davky)
+                 for n, sq in zip(velikosti, seedy)]
+        for uloha in as_completed(ulohy):
+            a, b, c, d = uloha.result()
+            h_strany += a; h_strany_kraje += b; h_kraje += c; presla += d
+
+    return VysledekSimulace(list(df_hlasy.index), list(KRAJE_NAZVY), pocet, h_strany, h_strany_kraje, h_kraje, presla)
+
+def shrn_simulaci(vysledek, kvantily=(0.05, 0.5, 0.95)):
+    """Vrátí tabulku s průměrem, kvantily a pravděpodobností zisku mandátu pro každou stranu."""
+    hodnoty = np.arange(vysledek.mandaty_stran.shape[1])
+    kumulativne = vysledek.mandaty_stran.cumsum(axis=1) / vysledek.pocet
+    df = pd.DataFrame(index=pd.Index(vysledek.strany, name='Strana'))
+    df['Průměr mandátů'] = (vysledek.mandaty_stran @ hodnoty) / vysledek.pocet
+    for q in kvantily:
+        df[f'Kvantil {q:g}'] = (kumulativne < q).sum(axis=1)
+    df['P(klauzule)'] = vysledek.presla_klauzuli / vysledek.pocet
+    df['P(mandát)'] = 1 - vysledek.mandaty_stran[:, 0] / vysledek.pocet
+    return df[df['P(klauzule)'] > 0].rename(index=MAPOVANI_NAZVU_STRAN)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Monte Carlo simulace rozdělení mandátů.')
+    parser.add_argument('-n', '--pocet', type=int, default=10_000, help='počet simulací (až 10^6)')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--sumeni', choices=['dirichlet', 'multinomial'], default='dirichlet')
+    parser.add_argument('--koncentrace', type=float, default=KONCENTRACE)
+    parser.add_argument('--procesy', type=int, default=None)
+    args = parser.parse_args()
+
+    vysledek = simuluj(nacti_matici_hlasu(), args.pocet, seed=args.seed, sumeni=args.sumeni,
+                       koncentrace=args.koncentrace, procesy=args.procesy)
+    print(shrn_simulaci(vysledek).round(3).to_string())
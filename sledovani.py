@@ -0,0 +1,138 @@
+import argparse
+import hashlib
+import time
+
+import numpy as np
+import pandas as pd
+
+from analyza import MAPOVANI_NAZVU_STRAN, VOLEBNI_KLAUZULE, alokuj_tabulku
+from archiv import ArchivStranek
+from scrape_data_selenium import BASE_URL, KRAJE, SOUBEZNOST, Stahovac, uloz_tabulku, zpracuj_tabulku
+
+# --- KONFIGURACE ---
+INTERVAL = 30  # sekundy mezi dotazy na výsledky
+
+
+def _otisk(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def rozdil_mandatu(pred, po):
+    """Vrátí tabulku změn mandátů (strana, kraj) mezi dvěma tabulkami strany × kraje."""
+    pred = pd.DataFrame(0, index=po.index, columns=po.columns) if pred is None else pred.reindex(index=po.index, fill_value=0)
+    zmena = (po - pred).stack()
+    zmena = zmena[zmena != 0]
+    df = pd.DataFrame({'před': pred.stack()[zmena.index], 'po': po.stack()[zmena.index], 'změna': zmena})
+    df.index.names = ['Strana', 'Kraj']
+    return df.rename(index=MAPOVANI_NAZVU_STRAN, level=0)
+
+
+class Sledovani:
+    """
+    Stav živého sledování mezi cykly: otisky stránek a tabulek, matice hlasů a poslední rozdělení mandátů.
+    V každém cyklu se zpracují jen kraje, jejichž obsah se změnil, a mandáty se přepočítají jen při změně.
+    """
+
+    def __init__(self, klauzule=VOLEBNI_KLAUZULE, ulozit_csv=True):
+        self.klauzule, self.ulozit_csv = klauzule, ulozit_csv
+        self.otisky_stranek, self.otisky_tabulek = {}, {}
+        self.hlasy = pd.DataFrame(columns=list(KRAJE), dtype=np.int64)
+        self.procenta = pd.Series(dtype=float)
+        self.mandaty = None
+
+    def aktualizuj(self, stranky):
+        """Zapracuje stažené stránky (dvojice nazev, html) a vrátí seznam krajů, jejichž výsledky se změnily."""
+        zmenene = []
+        for nazev, html in stranky:
+            if isinstance(html, Exception):
+                print(f'❌ Nastala neočekávaná chyba pro {nazev}: {html}')
+                continue
+            otisk = _otisk(html)
+            if self.otisky_stranek.get(nazev) == otisk:
+                continue
+            self.otisky_stranek[nazev] = otisk
+            try:
+                df = zpracuj_tabulku(nazev, html)
+            except Exception as e:
+                print(f'❌ Nepodařilo se zpracovat stránku pro {nazev}: {e}')
+                continue
+            otisk = _otisk(df.to_csv(index=False))
+            if self.otisky_tabulek.get(nazev) == otisk:
+                continue
+            self.otisky_tabulek[nazev] = otisk
+
+            hlasy = df.groupby('nazev_strany', sort=False)['hlasy_celkem'].last()
+            nove = hlasy.index.difference(self.hlasy.index, sort=False)
+            if len(nove):
+                self.hlasy = self.hlasy.reindex(self.hlasy.index.append(nove))
+            self.hlasy[nazev] = hlasy.reindex(self.hlasy.index)
+            self.hlasy = self.hlasy.fillna(0).astype(np.int64)
+            if nazev == 'Celkem':
+                self.procenta = df.groupby('nazev_strany', sort=False)['hlasy_procenta'].last()
+            if self.ulozit_csv:
+                uloz_tabulku(nazev, df)
+            zmenene.append(nazev)
+        return zmenene
+
+    def prepocitej(self):
+        """Přepočítá mandáty nad aktuální maticí hlasů a vrátí tabulku změn oproti minulému cyklu."""
+        uspesne_strany = self.procenta.index[self.procenta >= self.klauzule]
+        mandaty = alokuj_tabulku(self.hlasy, uspesne_strany)
+        zmeny = rozdil_mandatu(self.mandaty, mandaty)
+        self.mandaty = mandaty
+        return zmeny
+
+    def cyklus(self, stahovac):
+        """Jeden cyklus sledování. Vrací (změněné kraje, tabulka změn mandátů nebo None)."""
+        zmenene = self.aktualizuj(stahovac.stahni_vse())
+        if not zmenene or self.procenta.empty:
+            return zmenene, None
+        return zmenene, self.prepocitej()
+
+
+def sleduj(interval=INTERVAL, rezim='auto', soubeznost=SOUBEZNOST, base_url=BASE_URL,
+           klauzule=VOLEBNI_KLAUZULE, ulozit_csv=True, pocet_cyklu=None, archiv=None):
+    """
+    Opakovaně stahuje výsledky a vypisuje změny mandátů od minulého cyklu. Excelový report se negeneruje;
+    s ulozit_csv=True se přepíšou jen CSV změněných krajů, takže analyza.py je později načte z cache.
+    S archivem (archiv.ArchivStranek) se ukládá každá stažená stránka, aby šla noc později přehrát offline.
+    Výchozí režim 'auto' zkusí HTTP a při chybě nebo stránce bez tabulky použije prohlížeč (viz Stahovac).
+    Ověření proti stub serveru se skriptovanými snímky: python testovaci_server.py over-sledovani.
+    """
+    stav = Sledovani(klauzule, ulozit_csv)
+    with Stahovac(rezim, soubeznost, base_url, archiv) as stahovac:
+        cyklus = 0
+        while pocet_cyklu is None or cyklus < pocet_cyklu:
+            zacatek = time.monotonic()
+            zmenene, zmeny = stav.cyklus(stahovac)
+            cas = time.strftime('%H:%M:%S')
+            if zmeny is None:
+                print(f"[{cas}] Beze změny výsledků." if not zmenene else f"[{cas}] Změněno: {', '.join(zmenene)} (čeká se na celostátní výsledky).")
+            else:
+                print(f"[{cas}] Změněno: {', '.join(zmenene)} ({time.monotonic() - zacatek:.2f} s)")
+                if zmeny.empty:
+                    print("  Rozdělení mandátů se nezměnilo.")
+                else:
+                    print(zmeny.to_string())
+                    celkem = stav.mandaty.sum(axis=1)
+                    print('  Mandáty celkem: ' + ', '.join(f'{MAPOVANI_NAZVU_STRAN.get(s, s)} {m}' for s, m in celkem[celkem > 0].items()))
+            cyklus += 1
+            if pocet_cyklu is None or cyklus < pocet_cyklu:
+                time.sleep(max(0.0, interval - (time.monotonic() - zacatek)))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Živé sledování výsledků ve volební noci.')
+    parser.add_argument('--interval', type=float, default=INTERVAL)
+    parser.add_argument('--rezim', choices=['selenium', 'http', 'auto'], default='auto',
+                        help='auto: HTTP bez prohlížeče, při neúspěchu prohlížeč')
+    parser.add_argument('--soubeznost', type=int, default=SOUBEZNOST)
+    parser.add_argument('--base-url', default=BASE_URL)
+    parser.add_argument('--bez-csv', action='store_true', help='neukládat CSV změněných krajů')
+    parser.add_argument('--archiv', help='adresář archivu surových stránek')
+    args = parser.parse_args()
+
+    try:
+        sleduj(args.interval, args.rezim, args.soubeznost, args.base_url, ulozit_csv=not args.bez_csv,
+               archiv=ArchivStranek(args.archiv) if args.archiv else None)
+    except KeyboardInterrupt:
+        print("\n--- Sledování ukončeno. ---")
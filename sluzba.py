@@ -0,0 +1,225 @@
+import argparse
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from alokace import POCET_MANDATU, alokuj, procenta_hlasu
+from analyza import KRAJE_NAZVY, MAPOVANI_NAZVU_STRAN, VOLEBNI_KLAUZULE, ZDROJE_VYSLEDKU
+from nacitani import nacti_vysledky
+
+# --- KONFIGURACE ---
+HOST = '127.0.0.1'
+PORT = 8765
+VELIKOST_CACHE = 256  # počet zapamatovaných výsledků
+
+
+def otisk_vstupu(vstup):
+    """SHA-256 normalizovaného vstupu (JSON se seřazenými klíči)."""
+    return hashlib.sha256(json.dumps(vstup, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class NeuplneRozdeleni(ValueError):
+    """Rozdělení mandátů nesedí na požadovaný počet mandátů (např. žádná strana nepřekročila klauzuli)."""
+
+
+class LRUCache:
+    """Jednoduchá vláknově bezpečná LRU cache se statistikou zásahů."""
+
+    def __init__(self, velikost=VELIKOST_CACHE):
+        self.velikost = velikost
+        self.polozky = OrderedDict()
+        self.zasahy = self.vypocty = 0
+        self._zamek = threading.Lock()
+
+    def ziskej(self, klic, vypocet):
+        """Vrátí zapamatovanou hodnotu pro klíč, nebo ji spočítá funkcí vypocet() a uloží."""
+        with self._zamek:
+            if klic in self.polozky:
+                self.polozky.move_to_end(klic); self.zasahy += 1
+                return self.polozky[klic]
+        hodnota = vypocet()
+        with self._zamek:
+            self.polozky[klic] = hodnota; self.vypocty += 1
+            while len(self.polozky) > self.velikost:
+                self.polozky.popitem(last=False)
+        return hodnota
+
+    def vyprazdni(self):
+        with self._zamek:
+            self.polozky.clear()
+
+    def stav(self):
+        return {'velikost': self.velikost, 'polozek': len(self.polozky), 'zasahy': self.zasahy, 'vypocty': self.vypocty}
+
+
+class Sluzba:
+    """
+    Data voleb držená v paměti a výpočet rozdělení mandátů s přepsanými vstupy (klauzule, počet mandátů,
+    hlasy stran v krajích). Výsledky se pamatují v LRU cache podle otisku normalizovaného vstupu.
+    """
+
+    def __init__(self, data=None, velikost_cache=VELIKOST_CACHE):
+        self.cache = LRUCache(velikost_cache)
+        self.nacti(data)
+
+    def nacti(self, data=None):
+        """(Znovu) načte výsledky do paměti a vyprázdní cache."""
+        data = data if data is not None else nacti_vysledky(ZDROJE_VYSLEDKU)
+        celkem = data.soubory.index('Celkem')
+        self.strany = list(data.strany)
+        self.hlasy = np.array(data.hlasy[:, data.sloupce(KRAJE_NAZVY)], dtype=np.int64)
+        self.hlasy_celkem = np.array(data.hlasy[:, celkem], dtype=np.int64)
+        self.procenta = np.array(data.procenta[:, celkem], dtype=float)
+        self._index_stran = {s: i for i, s in enumerate(self.strany)}
+        self._index_stran.update({zkratka: self._index_stran[s] for s, zkratka in MAPOVANI_NAZVU_STRAN.items() if s in self._index_stran})
+        self.verze = getattr(self, 'verze', 0) + 1   # součást klíče, aby se po obnovení nevrátil starý výsledek
+        self.cache.vyprazdni()
+
+    def normalizuj(self, pozadavek):
+        """
+        Převede požadavek na kanonický tvar: klauzule (float), pocet_mandatu (int) a hlasy jako seřazený
+        seznam [strana, kraj, hlasy] s plnými názvy stran (strany lze zadat i zkratkou z MAPOVANI_NAZVU_STRAN).
+        Neplatný vstup vyvolá ValueError.
+        """
+        klauzule = float(pozadavek.get('klauzule', VOLEBNI_KLAUZULE))
+        pocet_mandatu = int(pozadavek.get('pocet_mandatu', POCET_MANDATU))
+        if not 0 <= klauzule <= 100 or pocet_mandatu < 1:
+            raise ValueError('klauzule musí být 0–100 a pocet_mandatu kladný')
+        hlasy = {}
+        for strana, kraje in (pozadavek.get('hlasy') or {}).items():
+            if strana not in self._index_stran:
+                raise ValueError(f'Neznámá strana: {strana}')
+            if not isinstance(kraje, dict):
+                raise ValueError(f'Hlasy strany {strana} musí být slovník {{kraj: hlasy}}')
+            for kraj, pocet in kraje.items():
+                if kraj not in KRAJE_NAZVY:
+                    raise ValueError(f'Neznámý kraj: {kraj}')
+                if int(pocet) < 0:
+                    raise ValueError('Počet hlasů nesmí být záporný')
+                hlasy[(self.strany[self._index_stran[strana]], kraj)] = int(pocet)
+        return {'klauzule': klauzule, 'pocet_mandatu': pocet_mandatu, 'hlasy': [[s, k, h] for (s, k), h in sorted(hlasy.items())]}
+
+    def spocitej(self, vstup):
+        """
+        Rozdělí mandáty pro normalizovaný vstup. Bez přepsaných hlasů se klauzule posuzuje podle oficiálních
+        procent z Celkem (jako v analyzuj_vysledky); po změně hlasů se procenta přepočtou a ořežou na 2 desetinná
+        místa (stejně jako na volby.cz). Pokud rozdělení nesedí na pocet_mandatu, vyvolá NeuplneRozdeleni.
+        """
+        hlasy, procenta = self.hlasy, self.procenta
+        if vstup['hlasy']:
+            hlasy = hlasy.copy()
+            for strana, kraj, pocet in vstup['hlasy']:
+                hlasy[self._index_stran[strana], KRAJE_NAZVY.index(kraj)] = pocet
+            celkem = self.hlasy_celkem + (hlasy - self.hlasy).sum(axis=1)
+            procenta = procenta_hlasu(celkem)
+        uspesne = procenta >= vstup['klauzule']
+        v = alokuj(hlasy, uspesne, pocet_mandatu=vstup['pocet_mandatu'])
+        if int(v.mandaty.sum()) != vstup['pocet_mandatu']:
+            # výjimka se do cache neuloží
+            raise NeuplneRozdeleni(f"Rozděleno {int(v.mandaty.sum())} mandátů místo {vstup['pocet_mandatu']}")
+
+        nazvy = [MAPOVANI_NAZVU_STRAN.get(s, s) for s in self.strany]
+        radky = np.flatnonzero(uspesne)
+        return {
+            'vstup': vstup,
+            'rmc': int(v.rmc), 'rvc': int(v.rvc),
+            'mandaty_kraju': dict(zip(KRAJE_NAZVY, v.mandaty_kraju.tolist())),
+            'kvc': dict(zip(KRAJE_NAZVY, v.kvc.tolist())),
+            'uspesne_strany': [nazvy[i] for i in radky],
+            'mandaty_stran': {nazvy[i]: int(v.mandaty[i].sum()) for i in radky},
+            'mandaty_f1': {nazvy[i]: int(v.mandaty_f1[i].sum()) for i in radky},
+            'mandaty_f2': {nazvy[i]: int(v.mandaty_f2[i]) for i in radky},
+            'mandaty': {nazvy[i]: dict(zip(KRAJE_NAZVY, v.mandaty[i].tolist())) for i in radky},
+        }
+
+    def mandaty(self, pozadavek):
+        """Normalizuje požadavek a vrátí (zapamatovaný) výsledek doplněný o klíč cache a dobu zpracování."""
+        start = time.perf_counter()
+        vstup = self.normalizuj(pozadavek)
+        klic = otisk_vstupu({**vstup, 'verze_dat': self.verze})
+        vysledek = self.cache.ziskej(klic, lambda: self.spocitej(vstup))
+        return {**vysledek, 'klic': klic, 'doba_ms': round(1000 * (time.perf_counter() - start), 3)}
+
+    def stav(self):
+        return {'strany': len(self.strany), 'kraje': KRAJE_NAZVY, 'verze_dat': self.verze, 'cache': self.cache.stav()}
+
+
+# --- HTTP ---
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    GET /stav, GET /mandaty?klauzule=..&pocet_mandatu=.., POST /mandaty (JSON), POST /obnov.
+    Neplatný vstup vrací 400, rozdělení, které nesedí na počet mandátů, 422.
+    """
+    sluzba = None
+
+    def _odpovez(self, kod, telo):
+        data = json.dumps(telo, ensure_ascii=False).encode('utf-8')
+        self.send_response(kod)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _zpracuj(self, akce):
+        try:
+            self._odpovez(200, akce())
+        except NeuplneRozdeleni as e:
+            self._odpovez(422, {'chyba': str(e)})
+        except (ValueError, TypeError, AttributeError) as e:
+            self._odpovez(400, {'chyba': str(e)})
+        except Exception as e:
+            self._odpovez(500, {'chyba': str(e)})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/stav':
+            self._zpracuj(self.sluzba.stav)
+        elif url.path == '/mandaty':
+            parametry = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            self._zpracuj(lambda: self.sluzba.mandaty(parametry))
+        else:
+            self._odpovez(404, {'chyba': f'Neznámá cesta: {url.path}'})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path == '/mandaty':
+            def akce():
+                telo = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                return self.sluzba.mandaty(json.loads(telo or b'{}'))
+            self._zpracuj(akce)
+        elif url.path == '/obnov':
+            self._zpracuj(lambda: (self.sluzba.nacti(), self.sluzba.stav())[1])
+        else:
+            self._odpovez(404, {'chyba': f'Neznámá cesta: {url.path}'})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def vytvor_server(sluzba=None, host=HOST, port=PORT):
+    """Vytvoří (nespuštěný) HTTP server nad službou; port 0 vybere volný port."""
+    handler = type('Handler', (_Handler,), {'sluzba': sluzba if sluzba is not None else Sluzba()})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Lokální HTTP/JSON služba pro rozdělení mandátů s daty v paměti.')
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--cache', type=int, default=VELIKOST_CACHE, help='počet zapamatovaných výsledků')
+    args = parser.parse_args()
+    server = vytvor_server(Sluzba(velikost_cache=args.cache), args.host, args.port)
+    print(f'✔ Služba běží na http://{args.host}:{server.server_port} (Ctrl+C ukončí)')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+# Statistiky nad VysledekAlokace. Všechny funkce pracují s volitelnou dávkovou osou '...'
+# a mají pevnou velikost výstupu na scénář (nezávislou na počtu mandátů).
+
+
+def ceny_mandatu(vysledek):
+    """
+    Vrátí ceny mandátů v kompaktním tvaru (ceny, pocty), oba (..., K + 1 + S):
+    KVČ každého kraje s počtem mandátů z 1. skrutinia v kraji, RVČ s počtem mandátů 2. skrutinia
+    přidělených dělením a zbytek každé strany s mandátem přiděleným podle zbytku (0 nebo 1).
+    """
+    ceny = np.concatenate([vysledek.kvc, vysledek.rvc[..., None], vysledek.zbytky_f2], axis=-1)
+    pocty = np.concatenate([vysledek.mandaty_f1.sum(axis=-2), vysledek.mandaty_f2_delenim.sum(axis=-1, keepdims=True),
+                            vysledek.mandaty_f2_zbytky], axis=-1)
+    return ceny, pocty
+
+def histogram_cen(ceny, pocty):
+    """Sečte mandáty se stejnou cenou pro jeden scénář; vrací (unikátní ceny sestupně, počty mandátů)."""
+    ceny, pocty = np.asarray(ceny).ravel(), np.asarray(pocty).ravel()
+    unikatni, inverzni = np.unique(ceny[pocty > 0], return_inverse=True)
+    soucty = np.bincount(inverzni, weights=pocty[pocty > 0], minlength=len(unikatni)).astype(np.int64)
+    return unikatni[::-1], soucty[::-1]
+
+def tabulka_cen(vysledek):
+    """Tabulka 'Detailní přehled cen všech mandátů' pro jeden scénář."""
+    ceny, pocty = histogram_cen(*ceny_mandatu(vysledek))
+    df = pd.DataFrame({'Cena mandátu (počet hlasů)': ceny, 'Počet mandátů za tuto cenu': pocty, 'Celkem hlasů': ceny * pocty}).astype(int)
+    df.index.name = 'Pořadí'; df.index += 1
+    return df
+
+def bilance_hlasu(vysledek):
+    """
+    Využití hlasů úspěšných stran; vrací slovník polí tvaru (...): hlasy a mandáty využité v 1. a 2. skrutiniu
+    a nevyužité zbytky po 2. skrutiniu.
+    """
+    return {
+        'pouzite_f1': (vysledek.mandaty_f1 * vysledek.kvc[..., None, :]).sum(axis=(-2, -1)),
+        'pouzite_f2': vysledek.mandaty_f2_delenim.sum(axis=-1) * vysledek.rvc + (vysledek.zbytky_f2 * vysledek.mandaty_f2_zbytky).sum(axis=-1),
+        'nevyuzite': (vysledek.zbytky_f2 * (1 - vysledek.mandaty_f2_zbytky)).sum(axis=-1),
+        'mandaty_f1': vysledek.mandaty_f1.sum(axis=(-2, -1)),
+        'mandaty_f2': vysledek.mandaty_f2.sum(axis=-1),
+    }
+
+def efektivita(vysledek, hlasy_stran):
+    """
+    Průměrný počet hlasů na mandát pro každou stranu; hlasy_stran (..., S) jsou celostátní hlasy.
+    Vrací (mandaty (..., S), prumer (..., S)), průměr je 0 u stran bez mandátu.
+    """
+    mandaty = vysledek.mandaty.sum(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        prumer = np.where(mandaty > 0, np.asarray(hlasy_stran) / mandaty, 0).astype(np.int64)
+    return mandaty, prumer
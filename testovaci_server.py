@@ -0,0 +1,236 @@
+import argparse
+import functools
+import html
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+import numpy as np
+import pandas as pd
+
+from alokace import procenta_hlasu
+from scrape_data_selenium import KRAJE, TARGET_DIR, Stahovac, url_kraje, zpracuj_tabulku
+from sledovani import Sledovani
+
+# --- KONFIGURACE ---
+ADRESAR_FIXTUR = 'fixtury'  # uložené stránky: fixtury/results/index.html, fixtury/results/!___1100/index.html ...
+
+# Lokální server s uloženými stránkami výsledků pro ověření stahování bez volby.cz. Stránky mají strukturu
+# jako na volby.cz (výsledková je druhá tabulka, tisíce oddělené nedělitelnou mezerou, desetinná čárka)
+# a server je posílá jako text/html bez charsetu.
+
+
+def _cele(n):
+    return f'{int(n):,}'.replace(',', '\xa0')
+
+def _desetinne(x):
+    return f'{float(x):.2f}'.replace('.', ',')
+
+def stranka_kraje(nazev, df):
+    """
+    HTML stránky kraje z čisté tabulky (sloupce jako vysledky_ps2025_*.csv); zahraničí je bez mandátů.
+    Celočíselný sloupec mandaty_procenta se vypíše bez desetinných míst, stejně jako na volby.cz.
+    """
+    procenta_mandatu = _cele if pd.api.types.is_integer_dtype(df['mandaty_procenta']) else _desetinne
+    radky = []
+    for i, r in enumerate(df.itertuples(index=False), start=1):
+        bunky = [str(i), html.escape(r.nazev_strany), _cele(r.hlasy_celkem), _desetinne(r.hlasy_procenta)]
+        if nazev != 'Zahranici':
+            bunky += [str(int(r.mandaty_pocet)), procenta_mandatu(r.mandaty_procenta)]
+        radky.append('<tr>' + ''.join(f'<td>{b}</td>' for b in bunky) + '</tr>')
+    hlavicka = ['Číslo', 'Název', 'Hlasy', '%'] + ([] if nazev == 'Zahranici' else ['Mandáty', '%'])
+    return ('<!DOCTYPE html>\n<html><head><title>Výsledky hlasování – ' + nazev + '</title></head><body>\n'
+            f'<table><tr><th>Voliči v seznamu</th><td>{_cele(df["hlasy_celkem"].sum())}</td></tr></table>\n'
+            '<table><thead><tr>' + ''.join(f'<th>{h}</th>' for h in hlavicka) + '</tr></thead>\n<tbody>\n'
+            + '\n'.join(radky) + '\n</tbody></table>\n</body></html>\n')
+
+def cesta_stranky(adresar, kod):
+    """Soubor stránky pro kód kraje, aby ho http.server vrátil na url_kraje(kod, <server>/results)."""
+    return os.path.join(adresar, 'results', f'!___{kod}' if kod else '', 'index.html')
+
+def nacti_tabulku(nazev, zdroj=TARGET_DIR):
+    return pd.read_csv(os.path.join(zdroj, f'vysledky_ps2025_{nazev}.csv'), sep=';', encoding='utf-8-sig')
+
+def generuj_fixtury(adresar=ADRESAR_FIXTUR, zdroj=TARGET_DIR, kraje=KRAJE):
+    """Vytvoří uložené stránky všech krajů z vysledky_ps2025_*.csv v adresáři `zdroj`. Vrací seznam cest."""
+    cesty = []
+    for nazev, kod in kraje.items():
+        df = nacti_tabulku(nazev, zdroj)
+        cesta = cesta_stranky(adresar, kod)
+        os.makedirs(os.path.dirname(cesta), exist_ok=True)
+        with open(cesta, 'w', encoding='utf-8') as f:
+            f.write(stranka_kraje(nazev, df))
+        cesty.append(cesta)
+    return cesty
+
+
+class _TichyHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+def spust_server(adresar=ADRESAR_FIXTUR, handler=None):
+    """Spustí server nad adresářem na volném portu ve vlákně na pozadí; vrací (server, base_url pro Stahovac)."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler or functools.partial(_TichyHandler, directory=adresar))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}/results'
+
+
+# --- SKRIPTOVANÉ SNÍMKY (sledování) ---
+
+def snimky_scitani(zdroj=TARGET_DIR, kroky=3, kraje=KRAJE):
+    """
+    Skriptovaná sekvence snímků průběžného sčítání jako seznam {nazev: tabulka}. V k-tém snímku (k = 1..kroky)
+    má prvních k/kroky krajů kompletní výsledky a ostatní polovinu hlasů; Celkem je jejich součet s procenty
+    oříznutými jako na volby.cz, v posledním snímku oficiální Celkem. Poslední snímek se opakuje (beze změny).
+    """
+    konecne = {nazev: nacti_tabulku(nazev, zdroj) for nazev in kraje}
+    regiony = [nazev for nazev in kraje if nazev != 'Celkem']
+    snimky = []
+    for k in range(1, kroky + 1):
+        hotove = set(regiony[:round(len(regiony) * k / kroky)])
+        snimek = {}
+        for nazev in regiony:
+            df = konecne[nazev].copy()
+            if nazev not in hotove:
+                df['hlasy_celkem'] //= 2
+                df[['mandaty_pocet', 'mandaty_procenta']] = 0
+            snimek[nazev] = df
+        if 'Celkem' in kraje:
+            if len(hotove) == len(regiony):
+                snimek['Celkem'] = konecne['Celkem']
+            else:
+                df = konecne['Celkem'].copy()
+                df['hlasy_celkem'] = sum(snimek[n].set_index('nazev_strany')['hlasy_celkem'] for n in regiony).reindex(df['nazev_strany']).fillna(0).astype(np.int64).values
+                df['hlasy_procenta'] = procenta_hlasu(df['hlasy_celkem'])
+                df[['mandaty_pocet', 'mandaty_procenta']] = 0
+                snimek['Celkem'] = df
+        snimky.append(snimek)
+    return snimky + [snimky[-1]]
+
+
+class _SnimkyHandler(BaseHTTPRequestHandler):
+    stranky = {}  # přepisuje ServerSnimku: cesta -> HTML aktuálního snímku
+
+    def do_GET(self):
+        stranka = self.stranky.get(unquote(urlparse(self.path).path).rstrip('/'))
+        if stranka is None:
+            self.send_error(404)
+            return
+        data = stranka.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ServerSnimku:
+    """
+    Stub server, který na /results a /results/!___<kod> vrací stránky aktuálního snímku skriptované
+    sekvence (viz snimky_scitani); prepni(i) přepne na i-tý snímek.
+    """
+
+    def __init__(self, snimky):
+        self.snimky = [{url_kraje(KRAJE[nazev], '/results'): stranka_kraje(nazev, df) for nazev, df in snimek.items()}
+                       for snimek in snimky]
+        self._handler = type('Handler', (_SnimkyHandler,), {'stranky': self.snimky[0]})
+        self.server, self.base_url = spust_server(handler=self._handler)
+
+    def prepni(self, i):
+        self._handler.stranky = self.snimky[i]
+
+    def zavri(self):
+        self.server.shutdown(); self.server.server_close()
+
+
+# --- OVĚŘENÍ ---
+
+def over_stahovani(adresar=ADRESAR_FIXTUR, zdroj=TARGET_DIR, rezim='http', kraje=KRAJE):
+    """
+    Stáhne uložené stránky z lokálního serveru Stahovacem, zpracuje je a porovná tabulky s vysledky_ps2025_*.csv
+    v adresáři `zdroj`. Vrací {nazev: chyba} pro kraje, které nesedí (prázdný = vše v pořádku).
+    """
+    chyby = {}
+    server, base_url = spust_server(adresar)
+    try:
+        with Stahovac(rezim, base_url=base_url) as stahovac:
+            for nazev, stranka in stahovac.stahni_vse(kraje):
+                try:
+                    if isinstance(stranka, Exception):
+                        raise stranka
+                    pd.testing.assert_frame_equal(zpracuj_tabulku(nazev, stranka).reset_index(drop=True),
+                                                  nacti_tabulku(nazev, zdroj), check_dtype=False)
+                except Exception as e:
+                    chyby[nazev] = str(e).strip().splitlines()[0]
+    finally:
+        server.shutdown(); server.server_close()
+    return chyby
+
+
+def over_sledovani(zdroj=TARGET_DIR, kroky=3, rezim='http'):
+    """
+    Projde skriptované snímky přes ServerSnimku cykly Sledovani (bez ukládání CSV) a ověří, že se v každém cyklu
+    zpracují právě změněné kraje a že po posledním snímku mandáty stran sedí na oficiální vysledky_ps2025_Celkem.csv.
+    Vrací (seznam chyb, doby cyklů v sekundách).
+    """
+    snimky = snimky_scitani(zdroj, kroky)
+    server, stav, chyby, doby = ServerSnimku(snimky), Sledovani(ulozit_csv=False), [], []
+    try:
+        with Stahovac(rezim, base_url=server.base_url) as stahovac:
+            for i, snimek in enumerate(snimky):
+                server.prepni(i)
+                ocekavane = {n for n, df in snimek.items() if i == 0 or not df.equals(snimky[i - 1][n])}
+                start = time.perf_counter()
+                zmenene, _ = stav.cyklus(stahovac)
+                doby.append(time.perf_counter() - start)
+                if set(zmenene) != ocekavane:
+                    chyby.append(f'snímek {i}: změněno {sorted(zmenene)}, očekáváno {sorted(ocekavane)}')
+    finally:
+        server.zavri()
+    oficialne = nacti_tabulku('Celkem', zdroj).groupby('nazev_strany', sort=False)['mandaty_pocet'].last()
+    spocteno = stav.mandaty.sum(axis=1).reindex(oficialne.index, fill_value=0) if stav.mandaty is not None else None
+    if spocteno is None or not (spocteno == oficialne).all():
+        chyby.append('mandáty po posledním snímku nesedí na oficiální výsledky')
+    return chyby, doby
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Lokální server s uloženými stránkami výsledků a ověření stahování.')
+    parser.add_argument('--fixtury', default=ADRESAR_FIXTUR)
+    podprikazy = parser.add_subparsers(dest='prikaz', required=True)
+    podprikazy.add_parser('generuj', help='vytvoří uložené stránky z vysledky_ps2025_*.csv')
+    p_over = podprikazy.add_parser('over', help='stáhne uložené stránky z lokálního serveru a porovná je s CSV')
+    p_over.add_argument('--rezim', choices=['http', 'auto', 'selenium'], default='http')
+    p_sledovani = podprikazy.add_parser('over-sledovani', help='přehraje skriptované snímky sčítání přes Sledovani')
+    p_sledovani.add_argument('--kroky', type=int, default=3)
+    podprikazy.add_parser('server', help='jen obsluhuje uložené stránky (pro ruční zkoušky)')
+    args = parser.parse_args()
+
+    if args.prikaz == 'generuj':
+        print(f'✔ Vytvořeno {len(generuj_fixtury(args.fixtury))} stránek v: {args.fixtury}')
+    elif args.prikaz == 'over':
+        chyby = over_stahovani(args.fixtury, rezim=args.rezim)
+        for nazev, chyba in chyby.items():
+            print(f'❌ {nazev}: {chyba}')
+        if chyby:
+            raise SystemExit(1)
+        print(f'✔ Všech {len(KRAJE)} krajů staženo a zpracováno shodně s vysledky_ps2025_*.csv.')
+    elif args.prikaz == 'over-sledovani':
+        chyby, doby = over_sledovani(kroky=args.kroky)
+        for chyba in chyby:
+            print(f'❌ {chyba}')
+        if chyby:
+            raise SystemExit(1)
+        print(f"✔ {len(doby)} cyklů sledování odpovídá snímkům (doby cyklů: {', '.join(f'{d:.3f}' for d in doby)} s).")
+    else:
+        server, base_url = spust_server(args.fixtury)
+        print(f'✔ Stránky na {base_url} (Ctrl+C ukončí)')
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown(); server.server_close()
@@ -0,0 +1,118 @@
+import importlib.util
+import os
+
+import pandas as pd
+import xlsxwriter
+
+# --- KONFIGURACE ---
+FORMATY = {
+    'title': {'bold': True, 'font_size': 14, 'bottom': 1},
+    'text': {'text_wrap': True, 'valign': 'top', 'italic': True},
+    'header': {'bold': True, 'text_wrap': True, 'valign': 'top', 'border': 1, 'align': 'center', 'bg_color': '#F2F2F2'},
+    'index': {'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'},
+}
+FORMATY_TABULEK = ('csv', 'json', 'parquet')
+ENGINY_PARQUET = ('pyarrow', 'fastparquet')
+
+# Sekce reportu je trojice (nadpis, popis, tabulka). Report je slovník {klíč: sekce}; stabilní klíč (např. KROK1)
+# určuje název souboru tabulky, nadpis (může obsahovat hodnoty z dat) slouží jen k zobrazení.
+
+
+# --- POMOCNÉ FUNKCE ---
+
+def _hodnoty_radku(dataframe):
+    """Řádky tabulky jako seznamy Pythonových hodnot (chybějící hodnoty jako None)."""
+    sloupce = [[None if pd.isna(v) else v for v in dataframe[c].tolist()] for c in dataframe.columns]
+    index = [None if pd.isna(v) else v for v in dataframe.index.tolist()]
+    return zip(index, *sloupce)
+
+def over_format_tabulek(format_vystupu):
+    """Ověří, že formát tabulek je podporovaný a že je pro něj nainstalovaná knihovna; jinak vyvolá výjimku."""
+    if format_vystupu not in FORMATY_TABULEK:
+        raise ValueError(f"Nepodporovaný formát výstupu: {format_vystupu}")
+    if format_vystupu == 'parquet' and not any(importlib.util.find_spec(e) for e in ENGINY_PARQUET):
+        raise ImportError("Formát parquet vyžaduje knihovnu pyarrow nebo fastparquet (pip install pyarrow).")
+
+# --- ZÁPIS ---
+
+class ExcelReport:
+    """
+    Zápis sekcí do sešitu xlsxwriter. Formáty se vytvářejí jednou na sešit a všechny buňky se zapisují
+    po řádcích shora dolů, takže lze zapnout režim constant_memory (každý dokončený řádek se hned
+    uloží na disk) i pro velké sešity s jedním listem na scénář.
+    """
+
+    def __init__(self, cesta, constant_memory=False):
+        self.cesta = cesta
+        self.workbook = xlsxwriter.Workbook(cesta, {'constant_memory': constant_memory, 'nan_inf_to_errors': True})
+        self.formaty = {nazev: self.workbook.add_format(vlastnosti) for nazev, vlastnosti in FORMATY.items()}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.workbook.close()
+
+    def zapis_sekci(self, worksheet, title, text, dataframe, start_row):
+        """Zapíše sekci (nadpis, text a tabulku) od řádku start_row; vrací první volný řádek pro další sekci."""
+        worksheet.merge_range(start_row, 0, start_row, 15, title, self.formaty['title'])
+        worksheet.merge_range(start_row + 2, 0, start_row + 6, 15, text, self.formaty['text'])
+
+        current_write_row = start_row + 8
+        if dataframe.index.name:
+            worksheet.write(current_write_row, 0, dataframe.index.name, self.formaty['header'])
+        for col_num, value in enumerate(dataframe.columns.values):
+            worksheet.write(current_write_row, col_num + 1, value, self.formaty['header'])
+
+        for radek, (index, *hodnoty) in enumerate(_hodnoty_radku(dataframe), start=current_write_row + 1):
+            if index is not None:
+                worksheet.write(radek, 0, index, self.formaty['index'])
+            worksheet.write_row(radek, 1, hodnoty)
+
+        return current_write_row + len(dataframe) + 5
+
+    def zapis_list(self, nazev_listu, sekce):
+        """Zapíše sekce (slovník {klíč: sekce}) na nový list."""
+        worksheet = self.workbook.add_worksheet(nazev_listu)
+        worksheet.set_column('A:A', 35)
+        worksheet.set_column('B:R', 12)
+        current_row = 1
+        for title, text, df in sekce.values():
+            current_row = self.zapis_sekci(worksheet, title, text, df, current_row)
+        return worksheet
+
+
+def zapis_excel(cesta, listy, constant_memory=False):
+    """Zapíše sešit; listy je slovník {název listu: sekce} (např. jeden list na scénář)."""
+    with ExcelReport(cesta, constant_memory) as report:
+        for nazev_listu, sekce in listy.items():
+            report.zapis_list(nazev_listu, sekce)
+
+def uloz_tabulky(sekce, adresar, format_vystupu='csv', predpona=''):
+    """
+    Uloží tabulky sekcí bez Excelu, každou do vlastního souboru {predpona}{klíč}.{format_vystupu} (např. KROK1.csv),
+    takže se název mezi běhy a scénáři nemění.
+    format_vystupu: 'csv', 'json' nebo 'parquet' (vyžaduje pyarrow nebo fastparquet). Formát se ověří před
+    vytvořením adresáře, takže při chybějící knihovně nezůstane prázdný adresář. Vrací seznam cest.
+    """
+    over_format_tabulek(format_vystupu)
+    os.makedirs(adresar, exist_ok=True)
+    cesty = []
+    for klic, (_, _, df) in sekce.items():
+        cesta = os.path.join(adresar, f'{predpona}{klic}.{format_vystupu}')
+        df = df.copy(); df.columns = [str(c) for c in df.columns]
+        if format_vystupu == 'csv':
+            df.to_csv(cesta, sep=';', encoding='utf-8-sig')
+        elif format_vystupu == 'json':
+            df.reset_index().to_json(cesta, orient='records', force_ascii=False, indent=1)
+        else:
+            df.astype({c: str for c in df.columns if df[c].dtype == object}).to_parquet(cesta)
+        cesty.append(cesta)
+    return cesty
+
+def uloz_report(sekce, cesta, format_vystupu='xlsx', constant_memory=False, nazev_listu='00_Postup_vypoctu'):
+    """Uloží sekce reportu buď jako Excel (cesta je soubor), nebo jako tabulky (cesta je adresář)."""
+    if format_vystupu == 'xlsx':
+        zapis_excel(cesta, {nazev_listu: sekce}, constant_memory)
+    else:
+        uloz_tabulky(sekce, cesta, format_vystupu)